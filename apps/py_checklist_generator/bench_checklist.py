@@ -0,0 +1,55 @@
+"""
+Time checklist creation for a batch of participants: one CLI process per
+person (the old clinic_assistant behaviour) against in-process rendering.
+
+    python bench_checklist.py              # 300 participants
+    python bench_checklist.py --count 50
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import generate_checklist
+
+SCRIPT = Path(__file__).resolve().parent / "generate_checklist.py"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark checklist generation.")
+    ap.add_argument("--count", type=int, default=300)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+
+        t0 = time.perf_counter()
+        for i in range(1, args.count + 1):
+            subprocess.run(
+                [sys.executable, str(SCRIPT), "--name", f"Participant P{i:03d}",
+                 "--phone", "XXXX1234", "--out", str(out / f"cli_{i}.md")],
+                check=True, stdout=subprocess.DEVNULL,
+            )
+        t_cli = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for i in range(1, args.count + 1):
+            generate_checklist.write_checklist(
+                out / f"lib_{i}.md", name=f"Participant P{i:03d}", phone="XXXX1234"
+            )
+        t_lib = time.perf_counter() - t0
+
+        same = all(
+            (out / f"cli_{i}.md").read_bytes() == (out / f"lib_{i}.md").read_bytes()
+            for i in range(1, args.count + 1)
+        )
+
+    print(f"One process per checklist: {t_cli:.2f} s for {args.count}")
+    print(f"In-process rendering     : {t_lib:.3f} s for {args.count}")
+    print("Files identical:", "yes" if same else "NO")
+
+
+if __name__ == "__main__":
+    main()
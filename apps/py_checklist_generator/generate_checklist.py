@@ -15,6 +15,24 @@ TEMPLATES = {
        "6) बैकअप: व्हाट्सएप, फ़ोटो\n\nफॉलो-अप दिनांक: {date}\n"
 }
 
+def follow_up_date(days=7):
+    return (datetime.date.today()+datetime.timedelta(days=days)).isoformat()
+
+def render_checklist(name, phone, apps="Google, WhatsApp, Bank", limit="₹5,000", lang="en", date=None):
+    """Return the filled one-page checklist text for one participant."""
+    return TEMPLATES[lang].format(
+        name=name,
+        phone=phone,
+        apps=apps,
+        limit=limit,
+        date=date or follow_up_date()
+    )
+
+def write_checklist(out, name, phone, apps="Google, WhatsApp, Bank", limit="₹5,000", lang="en", date=None):
+    path = pathlib.Path(out)
+    path.write_text(render_checklist(name, phone, apps, limit, lang, date), encoding="utf-8")
+    return path
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--name", required=True)
@@ -25,14 +43,7 @@ def main():
     p.add_argument("--out", default="checklist.md")
     args = p.parse_args()
 
-    text = TEMPLATES[args.lang].format(
-        name=args.name,
-        phone=args.phone,
-        apps=args.apps,
-        limit=args.limit,
-        date=(datetime.date.today()+datetime.timedelta(days=7)).isoformat()
-    )
-    pathlib.Path(args.out).write_text(text, encoding="utf-8")
+    write_checklist(args.out, args.name, args.phone, args.apps, args.limit, args.lang)
     print("Written", args.out)
 
 if __name__=="__main__":
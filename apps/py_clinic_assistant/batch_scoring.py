@@ -0,0 +1,135 @@
+"""
+Batch risk scoring for many participants at once.
+
+Answers are held as columns (one list, array or NumPy array per field)
+instead of one Answers object per person. Scores and categories match
+clinic_assistant.risk_score and risk_category exactly.
+"""
+from __future__ import annotations
+
+from itertools import repeat
+from operator import add, mul
+from typing import Iterable, Sequence
+
+from clinic_assistant import ANSWER_COLUMNS, RISK_FLAGS, Answers
+import metrics_schema  # on sys.path via clinic_assistant
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, plain lists work everywhere
+    np = None
+
+SCORE_FIELDS = (
+    "mfa_before", "mfa_after",
+    "screen_before", "screen_after",
+    "bank_before", "bank_after",
+    "scam_before", "scam_after",
+)
+NUMERIC_FIELDS = SCORE_FIELDS + RISK_FLAGS
+# Canonical metrics CSV columns behind NUMERIC_FIELDS, in the same order
+ROW_COLUMNS = tuple(ANSWER_COLUMNS[name] for name in NUMERIC_FIELDS)
+
+# Index = score 0..10
+CATEGORY_BY_SCORE = ("low",) * 5 + ("medium",) * 3 + ("high",) * 3
+
+# Points for missing protections, indexed by mfa + 2*screen + 4*bank + 8*scam
+PROTECTION_POINTS = [
+    2 * (mfa == 0) + 2 * (screen == 0) + 2 * (bank == 0) + max(0, 3 - scam)
+    for scam in range(6)
+    for bank in (0, 1)
+    for screen in (0, 1)
+    for mfa in (0, 1)
+]
+# Index = raw score before the cap at 10
+CAPPED = [min(10, raw) for raw in range(len(PROTECTION_POINTS) + len(RISK_FLAGS))]
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _normalise(name: str, value: int) -> int:
+    if name.startswith("scam_"):
+        return max(0, min(5, value))
+    return 1 if value else 0
+
+
+def columns_from_answers(items: Iterable[Answers]) -> dict[str, list[int]]:
+    """Turn Answers objects into one column per scoring field."""
+    cols: dict[str, list[int]] = {name: [] for name in NUMERIC_FIELDS}
+    for a in items:
+        for name in NUMERIC_FIELDS:
+            cols[name].append(_normalise(name, getattr(a, name)))
+    return cols
+
+
+def columns_from_rows(rows: Iterable[Sequence]) -> dict[str, list[int]]:
+    """Turn metrics rows into columns.
+
+    Each row holds the ROW_COLUMNS values in order, as
+    metrics_schema.read_columns yields them for any metrics CSV layout.
+    """
+    cols: dict[str, list[int]] = {name: [] for name in NUMERIC_FIELDS}
+    appends = [(name, cols[name].append) for name in NUMERIC_FIELDS]
+    for row in rows:
+        for (name, append), value in zip(appends, row):
+            append(_normalise(name, _to_int(value)))
+    return cols
+
+
+def columns_from_csv(paths: Iterable[str]) -> dict[str, list[int]]:
+    """Columns for every row of the given metrics CSV files."""
+    return columns_from_rows(metrics_schema.read_columns(paths, ROW_COLUMNS))
+
+
+def risk_scores(cols: dict[str, Sequence[int]], use_after: bool) -> list[int]:
+    """Scores for every participant, same rules as risk_score.
+
+    Protection and habit columns must hold 0 or 1 and scam scores 0 to 5;
+    columns_from_answers and columns_from_rows take care of that. Each step
+    below is one pass over whole columns, with no per-row Python code.
+    """
+    suffix = "_after" if use_after else "_before"
+    mfa = cols["mfa" + suffix]
+    screen = cols["screen" + suffix]
+    bank = cols["bank" + suffix]
+    scam = cols["scam" + suffix]
+    flags = [cols[name] for name in RISK_FLAGS]
+
+    if np is not None and isinstance(mfa, np.ndarray):
+        score = (
+            2 * (np.asarray(mfa) == 0)
+            + 2 * (np.asarray(screen) == 0)
+            + 2 * (np.asarray(bank) == 0)
+            + np.maximum(0, 3 - np.asarray(scam))
+            + np.sum(np.stack([np.asarray(f) != 0 for f in flags]), axis=0)
+        )
+        return np.clip(score, 0, 10).tolist()
+
+    keys = map(
+        add,
+        map(add, mfa, map(mul, screen, repeat(2))),
+        map(add, map(mul, bank, repeat(4)), map(mul, scam, repeat(8))),
+    )
+    raw = map(add, map(PROTECTION_POINTS.__getitem__, keys), map(sum, zip(*flags)))
+    return list(map(CAPPED.__getitem__, raw))
+
+
+def risk_categories(scores: Iterable[int]) -> list[str]:
+    """Category label for each score, same thresholds as risk_category."""
+    return list(map(CATEGORY_BY_SCORE.__getitem__, scores))
+
+
+def score_columns(cols: dict[str, Sequence[int]]) -> dict[str, list]:
+    """Before and after scores plus their categories for every participant."""
+    before = risk_scores(cols, use_after=False)
+    after = risk_scores(cols, use_after=True)
+    return {
+        "risk_score_before": before,
+        "risk_score_after": after,
+        "risk_category_before": risk_categories(before),
+        "risk_category_after": risk_categories(after),
+    }
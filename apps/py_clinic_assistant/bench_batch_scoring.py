@@ -0,0 +1,75 @@
+"""
+Compare per-row risk_score with batch_scoring on synthetic participants.
+
+    python bench_batch_scoring.py            # 1,000,000 rows
+    python bench_batch_scoring.py --rows 50000
+"""
+import argparse
+import datetime
+import random
+import time
+
+import batch_scoring
+from clinic_assistant import answers_from_row, risk_category, risk_score
+from generate_synthetic_metrics import generate_person
+
+
+def make_rows(n: int) -> list[dict]:
+    random.seed(44)
+    today = datetime.date.today()
+    rows = []
+    for i in range(n):
+        p_type = "student" if i % 3 else "senior"
+        rows.append(generate_person(f"S{i:03d}", p_type, today))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark batch risk scoring.")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    print(f"Generating {args.rows} synthetic rows ...")
+    rows = make_rows(args.rows)
+    answers = [answers_from_row(r) for r in rows]
+
+    t0 = time.perf_counter()
+    scalar = [
+        (
+            risk_score(a, use_after=False),
+            risk_score(a, use_after=True),
+        )
+        for a in answers
+    ]
+    scalar_cats = [(risk_category(b), risk_category(a)) for b, a in scalar]
+    t_scalar = time.perf_counter() - t0
+
+    cols = batch_scoring.columns_from_answers(answers)
+    t0 = time.perf_counter()
+    batch = batch_scoring.score_columns(cols)
+    t_batch = time.perf_counter() - t0
+
+    same = (
+        [s[0] for s in scalar] == batch["risk_score_before"]
+        and [s[1] for s in scalar] == batch["risk_score_after"]
+        and [c[0] for c in scalar_cats] == batch["risk_category_before"]
+        and [c[1] for c in scalar_cats] == batch["risk_category_after"]
+    )
+
+    print(f"Per-row path : {t_scalar:.2f} s  ({args.rows / t_scalar:,.0f} rows/s)")
+    print(f"Batch path   : {t_batch:.2f} s  ({args.rows / t_batch:,.0f} rows/s)")
+    print(f"Speed-up     : {t_scalar / t_batch:.1f}x")
+
+    if batch_scoring.np is not None:
+        np_cols = {k: batch_scoring.np.array(v, dtype="int8") for k, v in cols.items()}
+        t0 = time.perf_counter()
+        np_batch = batch_scoring.score_columns(np_cols)
+        t_np = time.perf_counter() - t0
+        same = same and np_batch == batch
+        print(f"NumPy path   : {t_np:.2f} s  ({args.rows / t_np:,.0f} rows/s)")
+
+    print("Results identical:", "yes" if same else "NO")
+
+
+if __name__ == "__main__":
+    main()
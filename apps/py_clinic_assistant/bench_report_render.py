@@ -0,0 +1,313 @@
+"""
+Compare report rendering before and after moving sections 3.1-3.9 into
+condition tables.
+
+"before" is render_report from clinic_assistant.py, which appends each
+line in turn. "after" is the candidate kept below: every section is a
+table of (condition, line) rows whose rendered text is cached per
+combination of the Answers fields it reads, and a report is one join.
+Both render the same synthetic participants (no file writes); the bench
+stops if any report differs by a single byte, then prints reports/s for
+each.
+
+    python bench_report_render.py              # 100,000 reports
+    python bench_report_render.py --count 20000 --repeat 5
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date
+from operator import attrgetter
+
+from clinic_assistant import Answers, answers_from_row, render_report
+from generate_synthetic_metrics import generate_person
+
+
+# Each detailed section (3.1 to 3.9) is a table of (condition, line) rows.
+# A condition takes the Answers object and returns whether the line is
+# shown; None means the line is always shown. Lines may use {a.<field>}.
+ALWAYS = None
+
+REPORT_SECTIONS = [
+    (
+        "3.1 Phone basics",
+        ("screen_after", "os_out_of_date"),
+        [
+            (lambda a: a.screen_after == 1, "- Your phone has a lock screen."),
+            (lambda a: a.screen_after != 1, "- Your phone does not have a lock screen set."),
+            (lambda a: a.os_out_of_date, "- Some updates are still pending on this phone."),
+            (lambda a: not a.os_out_of_date, "- Updates are mostly current."),
+            (ALWAYS, "**Recommended steps**"),
+            (lambda a: a.screen_after == 0, "- Set a PIN, pattern or fingerprint lock on this phone."),
+            (lambda a: a.os_out_of_date, "- Connect to home WiFi and run system and app updates."),
+        ],
+    ),
+    (
+        "3.2 Extra login protection",
+        ("mfa_after",),
+        [
+            (lambda a: a.mfa_after == 1, "- Extra login protection is on for at least one important account."),
+            (lambda a: a.mfa_after != 1, "- Extra login protection is still off for important accounts."),
+            (ALWAYS, "**Recommended steps**"),
+            (lambda a: a.mfa_after == 0, "- Turn on two step verification on your main email and banking app."),
+            (ALWAYS, "- Never share one time codes with anyone, even if they say they are support."),
+        ],
+    ),
+    (
+        "3.3 Bank and UPI limits",
+        ("bank_after",),
+        [
+            (lambda a: a.bank_after == 1, "- A daily bank or UPI limit is set or was checked in this session."),
+            (lambda a: a.bank_after != 1, "- No clear daily limit is set inside your banking or UPI app."),
+            (ALWAYS, "**Recommended steps**"),
+            (ALWAYS, "- Set a daily transfer limit that fits normal use but is not too high."),
+            (ALWAYS, "- Use a lower limit for routine payments and confirm again for rare high value transfers."),
+        ],
+    ),
+    (
+        "3.4 WiFi and network use",
+        ("used_public_wifi", "has_home_wifi_issues"),
+        [
+            (lambda a: a.used_public_wifi, "- You used public or free WiFi recently."),
+            (lambda a: a.has_home_wifi_issues, "- Home WiFi may still have a simple password or old router settings."),
+            (ALWAYS, "**Recommended steps**"),
+            (lambda a: a.used_public_wifi, "- Avoid doing banking or very important changes on free public WiFi."),
+            (lambda a: a.has_home_wifi_issues, "- Change the router password to a longer one and use WPA2 or WPA3 if available."),
+        ],
+    ),
+    (
+        "3.5 QR codes and payments",
+        ("scanned_unknown_qr", "used_public_qr_for_payment"),
+        [
+            (lambda a: a.scanned_unknown_qr or a.used_public_qr_for_payment,
+             "- You have used QR codes without always checking name and amount."),
+            (lambda a: not (a.scanned_unknown_qr or a.used_public_qr_for_payment),
+             "- You already check QR payment details carefully."),
+            (ALWAYS, "**Recommended steps**"),
+            (ALWAYS, "- Scan QR codes only from trusted shops or people."),
+            (ALWAYS, "- Always read the name and amount on the payment confirmation screen before you tap approve."),
+        ],
+    ),
+    (
+        "3.6 Apps and updates",
+        ("installed_unknown_apps", "os_out_of_date"),
+        [
+            (lambda a: a.installed_unknown_apps, "- You installed apps from links or files outside the official store."),
+            (lambda a: a.os_out_of_date, "- There are still pending updates."),
+            (ALWAYS, "**Recommended steps**"),
+            (lambda a: a.installed_unknown_apps, "- Remove apps that you do not recognise or no longer use."),
+            (ALWAYS, "- Keep phone and app updates running until nothing is pending."),
+        ],
+    ),
+    (
+        "3.7 USB devices and charging",
+        ("inserted_unknown_usb", "used_public_usb_charger"),
+        [
+            (lambda a: a.inserted_unknown_usb or a.used_public_usb_charger,
+             "- You used unknown USB devices or free charging points."),
+            (lambda a: not (a.inserted_unknown_usb or a.used_public_usb_charger),
+             "- You already avoid unsafe USB devices and charging points."),
+            (ALWAYS, "**Recommended steps**"),
+            (ALWAYS, "- Prefer your own charger plugged into a normal power socket."),
+            (ALWAYS, "- Avoid unknown pen drives and shared USB sticks."),
+        ],
+    ),
+    (
+        "3.8 Passwords and sharing",
+        ("shares_device_without_lock", "password_reuse", "has_password_manager"),
+        [
+            (lambda a: a.shares_device_without_lock, "- You sometimes give your phone to others while it is unlocked."),
+            (lambda a: a.password_reuse, "- The same password is reused on more than one site."),
+            (lambda a: a.has_password_manager, "- You already use a password manager."),
+            (ALWAYS, "**Recommended steps**"),
+            (lambda a: a.shares_device_without_lock,
+             "- Lock the phone before handing it over or open only the app they need."),
+            (lambda a: a.password_reuse, "- Change passwords on email and banking so they are not reused elsewhere."),
+            (lambda a: not a.has_password_manager, "- Consider a simple password manager for your main accounts."),
+        ],
+    ),
+    (
+        "3.9 Scam messages and calls",
+        ("scam_before", "scam_after"),
+        [
+            (ALWAYS, "- Scam quiz score before the clinic: {a.scam_before} out of 5."),
+            (ALWAYS, "- Scam quiz score after the clinic : {a.scam_after} out of 5."),
+            (ALWAYS, "**Recommended steps**"),
+            (ALWAYS, "- Slow down for calls or messages about urgent money, refunds, KYC or prizes."),
+            (ALWAYS, "- Open official apps directly instead of using links from such messages."),
+        ],
+    ),
+]
+
+REPORT_AREAS = (
+    "## 2. Areas covered in this report\n"
+    "- Phone basics such as lock screen and updates\n"
+    "- Extra login protection such as two step verification\n"
+    "- Banking and UPI daily limits\n"
+    "- Public WiFi and home WiFi\n"
+    "- QR code payments and random QR scans\n"
+    "- Apps from outside the store and pending updates\n"
+    "- USB devices and public USB charging\n"
+    "- Password reuse, sharing and password managers\n"
+    "- Scam messages, links and urgent calls\n"
+    "\n"
+    "## 3. Detailed areas and next steps\n"
+    "\n"
+)
+
+CHANGE_REDUCED = (
+    "- Change in this visit: risk reduced by {points} points "
+    "based on your answers and checks."
+)
+CHANGE_INCREASED = (
+    "- Change in this visit: risk increased by {points} points "
+    "based on your answers and checks."
+)
+CHANGE_SAME = "- Change in this visit: overall risk score stayed the same."
+
+REPORT_TAIL = (
+    "## 4. When to ask for help at once\n"
+    "- If money moves without your clear action, call your bank helpline or the number shown in your official banking app.\n"
+    "- If you shared a one time password, card number or PIN by mistake, call the bank and ask them to block and review.\n"
+    "- For online fraud or suspicious links, you can raise a complaint on the National Cyber Crime Portal: https://cybercrime.gov.in\n"
+    "- In many parts of India you can also call the cyber fraud helpline 1930 where it is active.\n"
+    "\n"
+    "## 5. Notes from this session\n"
+)
+REPORT_REMINDER = (
+    "\n"
+    "\n"
+    "## 6. Reminder\n"
+    "This report is based on one clinic visit and the answers you gave.\n"
+    "Keep it with your one page checklist and update both as your habits improve."
+)
+
+
+class _CompiledSection:
+    """One detailed section, with its rendered text cached per answer combination.
+
+    The text of a section depends only on the few Answers fields listed
+    for it, so each distinct combination is rendered once from the
+    condition table and then reused.
+    """
+
+    MAX_CACHED = 4096
+
+    def __init__(self, title, fields, rows):
+        self.title = f"### {title}"
+        self.key = attrgetter(*fields)
+        self.rows = rows
+        self.cache: dict = {}
+
+    def render(self, a: Answers) -> str:
+        lines = [self.title]
+        for condition, line in self.rows:
+            if condition is None or condition(a):
+                lines.append(line.format(a=a) if "{" in line else line)
+        lines.append("")
+        text = "\n".join(lines) + "\n"
+        if len(self.cache) < self.MAX_CACHED:
+            self.cache[self.key(a)] = text
+        return text
+
+
+COMPILED_SECTIONS = [_CompiledSection(*section) for section in REPORT_SECTIONS]
+SECTION_LOOKUP = [(s, s.key, s.cache.get) for s in COMPILED_SECTIONS]
+
+
+def render_report_tables(
+    code: str,
+    a: Answers,
+    before: int,
+    after: int,
+    cat_before: str,
+    cat_after: str,
+    notes: str,
+    report_date: str = "",
+) -> str:
+    delta = after - before
+    if delta < 0:
+        change_line = CHANGE_REDUCED.format(points=abs(delta))
+    elif delta > 0:
+        change_line = CHANGE_INCREASED.format(points=delta)
+    else:
+        change_line = CHANGE_SAME
+    today = report_date or date.today().isoformat()
+    parts = [
+        f"# SAHAYAM security report for {code}\n"
+        "\n"
+        f"Date of this report: {today}\n"
+        f"Participant info: type: {a.participant_type}, age group: {a.age_group}\n"
+        "\n"
+        "## 1. Summary of this visit\n"
+        f"- Estimated risk before the clinic: {before} out of 10  (category: {cat_before})\n"
+        f"- Estimated risk after the clinic : {after} out of 10  (category: {cat_after})\n"
+        f"{change_line}\n"
+        "\n"
+        "This score is not a guarantee or a formal audit. It is a guide built from your "
+        "own answers and a few quick checks.\n"
+        "\n",
+        REPORT_AREAS,
+    ]
+    for section, key, cached in SECTION_LOOKUP:
+        text = cached(key(a))
+        parts.append(text if text is not None else section.render(a))
+    parts.append(REPORT_TAIL)
+    parts.append(notes or "")
+    parts.append(REPORT_REMINDER)
+    return "".join(parts)
+
+
+def timed(render, jobs):
+    """(seconds, reports) for rendering every job once."""
+    t0 = time.perf_counter()
+    out = [render(*job) for job in jobs]
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark report rendering before and after.")
+    ap.add_argument("--count", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3, help="runs of each renderer; the best is kept")
+    args = ap.parse_args()
+
+    random.seed(44)
+    today = date.today()
+    jobs = []
+    for i in range(args.count):
+        row = generate_person(f"P{i:03d}", "senior" if i % 4 == 0 else "student", today)
+        jobs.append((
+            row["participant_code"],
+            answers_from_row(row),
+            row["risk_score_before"],
+            row["risk_score_after"],
+            row["risk_category_before"],
+            row["risk_category_after"],
+            "",
+            row["date"],
+        ))
+
+    best = {}
+    outputs = {}
+    for _ in range(max(1, args.repeat)):
+        for name, render in (("before", render_report), ("after", render_report_tables)):
+            elapsed, outputs[name] = timed(render, jobs)
+            best[name] = min(elapsed, best.get(name, elapsed))
+
+    for i, (old, new) in enumerate(zip(outputs["before"], outputs["after"])):
+        if old != new:
+            print(f"Output differs for {jobs[i][0]}", file=sys.stderr)
+            return 1
+    total_chars = sum(map(len, outputs["before"]))
+
+    print(f"Rendered {args.count} reports, byte-identical, "
+          f"{total_chars / args.count:,.0f} characters each on average")
+    for name in ("before", "after"):
+        print(f"{name:<7}{args.count / best[name]:>12,.0f} reports/s")
+    print(f"speed-up {best['before'] / best['after']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
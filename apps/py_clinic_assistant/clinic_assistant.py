@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import csv
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-import subprocess
+import hashlib
+import json
+import os
+import re
+import sys
 
 # Project paths
 ROOT = Path(__file__).resolve().parents[2]
 METRICS_CSV = ROOT / "metrics" / "baseline_vs_week1.csv"
 GEN_DIR = ROOT / "materials" / "generated"
 
+sys.path.insert(0, str(ROOT / "apps" / "py_metrics_logger"))
+sys.path.insert(0, str(ROOT / "apps" / "py_checklist_generator"))
+import generate_checklist  # noqa: E402
+import metrics_schema  # noqa: E402
+import metrics_store  # noqa: E402
+
+# Participant codes: P### from clinics, S### / C### from the synthetic generator
+CODE_RE = re.compile(r"^([A-Z])(\d+)$")
+
 
 # -----------------------------
 # Data model
@@ -44,6 +60,60 @@ class Answers:
     fell_for_social_link_or_call: int
 
 
+# Column order of baseline_vs_week1.csv
+HEADER = [
+    "session_id", "participant_code", "participant_type", "age_group", "language",
+    "mfa_before", "mfa_after", "screen_lock_before", "screen_lock_after",
+    "bank_limit_before", "bank_limit_after", "scam_quiz_score_before", "scam_quiz_score_after",
+    "used_public_wifi", "has_home_wifi_issues", "scanned_unknown_qr", "used_public_qr_for_payment",
+    "installed_unknown_apps", "os_out_of_date", "inserted_unknown_usb", "used_public_usb_charger",
+    "shares_device_without_lock", "password_reuse", "has_password_manager", "fell_for_social_link_or_call",
+    "risk_score_before", "risk_score_after", "risk_category_before", "risk_category_after", "date", "notes",
+]
+
+# Answers field -> CSV column (only the protections use different names)
+ANSWER_COLUMNS = {
+    "participant_type": "participant_type",
+    "age_group": "age_group",
+    "language": "language",
+    "mfa_before": "mfa_before",
+    "mfa_after": "mfa_after",
+    "screen_before": "screen_lock_before",
+    "screen_after": "screen_lock_after",
+    "bank_before": "bank_limit_before",
+    "bank_after": "bank_limit_after",
+    "scam_before": "scam_quiz_score_before",
+    "scam_after": "scam_quiz_score_after",
+    "used_public_wifi": "used_public_wifi",
+    "has_home_wifi_issues": "has_home_wifi_issues",
+    "scanned_unknown_qr": "scanned_unknown_qr",
+    "used_public_qr_for_payment": "used_public_qr_for_payment",
+    "installed_unknown_apps": "installed_unknown_apps",
+    "os_out_of_date": "os_out_of_date",
+    "inserted_unknown_usb": "inserted_unknown_usb",
+    "used_public_usb_charger": "used_public_usb_charger",
+    "shares_device_without_lock": "shares_device_without_lock",
+    "password_reuse": "password_reuse",
+    "has_password_manager": "has_password_manager",
+    "fell_for_social_link_or_call": "fell_for_social_link_or_call",
+}
+
+# Yes/no habits that each add one point in risk_score
+RISK_FLAGS = (
+    "used_public_wifi",
+    "has_home_wifi_issues",
+    "scanned_unknown_qr",
+    "used_public_qr_for_payment",
+    "installed_unknown_apps",
+    "os_out_of_date",
+    "inserted_unknown_usb",
+    "used_public_usb_charger",
+    "shares_device_without_lock",
+    "password_reuse",
+    "fell_for_social_link_or_call",
+)
+
+
 # -----------------------------
 # Input helpers
 # -----------------------------
@@ -120,18 +190,46 @@ def risk_category(score: int) -> str:
 # -----------------------------
 # Metrics file helpers
 # -----------------------------
+def read_last_line(path: Path, block_size: int = 4096) -> str:
+    """Return the last non-empty line of a file by seeking back from the end.
+
+    Only the final few kilobytes are read, so the cost does not grow with the
+    number of rows already logged.
+    """
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            body = data.rstrip(b"\r\n")
+            if b"\n" in body:
+                return body.rsplit(b"\n", 1)[1].decode("utf-8", errors="replace")
+        return data.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+
 def next_code() -> str:
+    """Next P### code, based only on the last row of the metrics file.
+
+    Codes keep growing past P999 (P1000, P1001 ...). Rows written by
+    generate_synthetic_metrics.py use S### and C### codes, so a file that
+    ends with one of those starts the clinic numbering again at P001.
+    """
     if not METRICS_CSV.exists():
         return "P001"
     try:
-        rows = METRICS_CSV.read_text(encoding="utf-8").strip().splitlines()
+        last_line = read_last_line(METRICS_CSV)
     except OSError:
         return "P001"
-    if len(rows) <= 1:
+    fields = next(csv.reader([last_line]), [])
+    if len(fields) < 2 or fields[0] == "session_id":
         return "P001"
-    last = rows[-1].split(",")[1]
-    if last.startswith("P") and last[1:].isdigit():
-        num = int(last[1:]) + 1
+    match = CODE_RE.match(fields[1].strip())
+    if match and match.group(1) == "P":
+        num = int(match.group(2)) + 1
     else:
         num = 1
     return f"P{num:03d}"
@@ -141,16 +239,22 @@ def ensure_header():
     if METRICS_CSV.exists():
         return
     METRICS_CSV.parent.mkdir(parents=True, exist_ok=True)
-    header = (
-        "session_id,participant_code,participant_type,age_group,language,"
-        "mfa_before,mfa_after,screen_lock_before,screen_lock_after,"
-        "bank_limit_before,bank_limit_after,scam_quiz_score_before,scam_quiz_score_after,"
-        "used_public_wifi,has_home_wifi_issues,scanned_unknown_qr,used_public_qr_for_payment,"
-        "installed_unknown_apps,os_out_of_date,inserted_unknown_usb,used_public_usb_charger,"
-        "shares_device_without_lock,password_reuse,has_password_manager,fell_for_social_link_or_call,"
-        "risk_score_before,risk_score_after,risk_category_before,risk_category_after,date,notes\n"
-    )
-    METRICS_CSV.write_text(header, encoding="utf-8")
+    METRICS_CSV.write_text(",".join(HEADER) + "\n", encoding="utf-8")
+
+
+def answers_from_row(row: dict) -> Answers:
+    """Rebuild an Answers object from one metrics CSV row (as a dict)."""
+    values = {}
+    for field, column in ANSWER_COLUMNS.items():
+        raw = row.get(column, "")
+        if field in ("participant_type", "age_group", "language"):
+            values[field] = str(raw)
+        else:
+            try:
+                values[field] = int(raw)
+            except (TypeError, ValueError):
+                values[field] = 0
+    return Answers(**values)
 
 
 def append_metrics(
@@ -201,6 +305,11 @@ def append_metrics(
         writer = csv.writer(f)
         writer.writerow(row)
 
+    # Binary copy for fast analytics; the CSV stays the source of truth.
+    # The first time, the whole CSV (including this row) is imported; after
+    # that only rows added since (by this or by log_session.py).
+    metrics_store.sync_csv(METRICS_CSV, METRICS_CSV.with_suffix(".bin"))
+
 
 # -----------------------------
 # Checklist + report
@@ -208,29 +317,19 @@ def append_metrics(
 def run_checklist(name: str, phone_last4: str, participant_code: str):
     GEN_DIR.mkdir(parents=True, exist_ok=True)
     out_path = GEN_DIR / f"checklist_{participant_code}.en.md"
-    cmd = [
-        "python3",
-        str(ROOT / "apps" / "py_checklist_generator" / "generate_checklist.py"),
-        "--name",
-        name or f"Participant {participant_code}",
-        "--phone",
-        "XXXX" + phone_last4,
-        "--apps",
-        "Google, WhatsApp, Bank",
-        "--limit",
-        "₹5,000",
-        "--lang",
-        "en",
-        "--out",
-        str(out_path),
-    ]
     print("Creating one page checklist for this person")
-    print("Running checklist generator")
-    subprocess.run(cmd, check=True)
+    generate_checklist.write_checklist(
+        out_path,
+        name=name or f"Participant {participant_code}",
+        phone="XXXX" + phone_last4,
+        apps="Google, WhatsApp, Bank",
+        limit="₹5,000",
+        lang="en",
+    )
     print("Checklist saved in", out_path)
 
 
-def generate_report(
+def render_report(
     code: str,
     a: Answers,
     before: int,
@@ -238,9 +337,9 @@ def generate_report(
     cat_before: str,
     cat_after: str,
     notes: str,
-):
-    GEN_DIR.mkdir(parents=True, exist_ok=True)
-    today = date.today().isoformat()
+    report_date: str = "",
+) -> str:
+    today = report_date or date.today().isoformat()
     lines: list[str] = []
 
     lines.append(f"# SAHAYAM security report for {code}")
@@ -422,15 +521,153 @@ def generate_report(
     lines.append("This report is based on one clinic visit and the answers you gave.")
     lines.append("Keep it with your one page checklist and update both as your habits improve.")
 
+    return "\n".join(lines)
+
+
+def generate_report(
+    code: str,
+    a: Answers,
+    before: int,
+    after: int,
+    cat_before: str,
+    cat_after: str,
+    notes: str,
+):
+    GEN_DIR.mkdir(parents=True, exist_ok=True)
     out_path = GEN_DIR / f"report_{code}.en.md"
-    out_path.write_text("\n".join(lines), encoding="utf-8")
+    text = render_report(code, a, before, after, cat_before, cat_after, notes)
+    out_path.write_text(text, encoding="utf-8")
     print("Report saved in", out_path)
 
 
+# -----------------------------
+# Batch report regeneration
+# -----------------------------
+REPORT_MANIFEST = ".reports_manifest.json"
+REPORT_BATCH_SIZE = 256
+
+
+def _int_field(row: dict, key: str) -> int:
+    try:
+        return int(row.get(key, 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+# Canonical metrics CSV columns a report is made from
+REPORT_COLUMNS = (
+    ["participant_code"]
+    + list(ANSWER_COLUMNS.values())
+    + ["risk_score_before", "risk_score_after", "risk_category_before",
+       "risk_category_after", "notes", "date", "session_id"]
+)
+
+
+def _report_args(row: dict) -> tuple:
+    """render_report arguments for one metrics CSV row."""
+    return (
+        row["participant_code"],
+        answers_from_row(row),
+        _int_field(row, "risk_score_before"),
+        _int_field(row, "risk_score_after"),
+        row.get("risk_category_before", ""),
+        row.get("risk_category_after", ""),
+        row.get("notes", ""),
+        row.get("date") or row.get("session_id") or "",
+    )
+
+
+def _render_batch(batch: list[tuple]) -> list[tuple[str, str]]:
+    return [(args[0], render_report(*args)) for args in batch]
+
+
+def regenerate_all_reports(jobs: int | None = None) -> tuple[int, int, int]:
+    """Rewrite report_*.en.md for every participant in the metrics CSV.
+
+    Rows are streamed from the CSV (any metrics_schema layout) and
+    rendered in batches on a process pool. If a code appears on several
+    rows, only the last one is rendered. The manifest keeps, per code, a
+    hash of that row and this file's code, and a report is skipped when
+    it has not changed, so re-running after a wording fix rewrites
+    everything and re-running without changes rewrites nothing. The
+    report date is taken from the row, not from today.
+
+    Returns (reports written, unchanged and skipped, rows superseded by a
+    later row with the same code).
+    """
+    if not METRICS_CSV.exists():
+        print("No metrics file found at", METRICS_CSV)
+        return 0, 0, 0
+    GEN_DIR.mkdir(parents=True, exist_ok=True)
+    manifest_path = GEN_DIR / REPORT_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    code_hash = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+    # A first, cheap pass finds the row each report is made from
+    last_row = {}
+    for i, (code,) in enumerate(metrics_schema.read_columns([METRICS_CSV], ["participant_code"], warn=False)):
+        last_row[code.strip()] = i
+
+    written = unchanged = superseded = 0
+    pending: deque = deque()
+
+    def finish_oldest():
+        nonlocal written
+        future, hashes = pending.popleft()
+        for code, text in future.result():
+            (GEN_DIR / f"report_{code}.en.md").write_text(text, encoding="utf-8")
+            manifest[code] = hashes[code]
+            written += 1
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        batch: list[tuple] = []
+        hashes: dict[str, str] = {}
+        rows = metrics_schema.read_columns([METRICS_CSV], REPORT_COLUMNS)
+        for i, values in enumerate(rows):
+            code = values[0].strip()
+            if not code:
+                continue
+            last = last_row.get(code, -1)
+            if last > i:
+                superseded += 1
+                continue
+            if last < i:
+                # Appended after the first pass, left for the next run
+                continue
+            key = hashlib.sha1(
+                json.dumps([code_hash, values]).encode("utf-8")
+            ).hexdigest()
+            out_path = GEN_DIR / f"report_{code}.en.md"
+            if manifest.get(code) == key and out_path.exists():
+                unchanged += 1
+                continue
+            row = dict(zip(REPORT_COLUMNS, values))
+            row["participant_code"] = code
+            batch.append(_report_args(row))
+            hashes[code] = key
+            if len(batch) >= REPORT_BATCH_SIZE:
+                pending.append((pool.submit(_render_batch, batch), hashes))
+                batch, hashes = [], {}
+                # Keep only a few batches in flight so memory stays bounded
+                while len(pending) > 2 * jobs:
+                    finish_oldest()
+        if batch:
+            pending.append((pool.submit(_render_batch, batch), hashes))
+        while pending:
+            finish_oldest()
+
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return written, unchanged, superseded
+
+
 # -----------------------------
 # Main flow
 # -----------------------------
-def main():
+def run_session():
     print("=== SAHAYAM clinic assistant  custom risk and report ===")
     print("This tool checks")
     print("1  screen lock and phone basics")
@@ -575,5 +812,23 @@ def main():
     generate_report(code, a_after, before, after, cat_before, cat_after, notes)
 
 
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SAHAYAM clinic assistant.")
+    ap.add_argument("--regenerate-all", action="store_true",
+                    help="rewrite the report for every row in the metrics CSV and exit")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="worker processes for --regenerate-all (default: all cores)")
+    args = ap.parse_args(argv)
+
+    if args.regenerate_all:
+        written, unchanged, superseded = regenerate_all_reports(args.jobs)
+        print(f"Reports written: {written}, unchanged and skipped: {unchanged}, "
+              f"rows replaced by a later row for the same code: {superseded}")
+        print("Reports are in", GEN_DIR)
+        return
+
+    run_session()
+
+
 if __name__ == "__main__":
     main()
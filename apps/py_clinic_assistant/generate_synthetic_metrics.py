@@ -208,6 +208,9 @@ def main():
         for row in rows:
             writer.writerow(row)
 
+    # The binary copy no longer matches; it is rebuilt on the next append
+    METRICS.with_suffix(".bin").unlink(missing_ok=True)
+
     print("Written synthetic metrics to", METRICS)
     print("Total rows:", len(rows))
 
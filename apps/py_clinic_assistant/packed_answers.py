@@ -0,0 +1,156 @@
+"""
+Compact in-memory form of Answers for loading many clinic records.
+
+A PackedAnswers is a plain int: all yes/no answers and both scam quiz
+scores live in its low bits, and the high bits hold the index of the
+(participant_type, age_group, language) combination in a shared table.
+It exposes the same attribute names as Answers, so it can be passed
+straight to risk_score.
+"""
+from __future__ import annotations
+
+from clinic_assistant import ANSWER_COLUMNS, RISK_FLAGS, Answers
+
+TEXT_FIELDS = ("participant_type", "age_group", "language")
+
+# One bit each, in this order from bit 0
+BIT_FIELDS = (
+    "mfa_before", "mfa_after",
+    "screen_before", "screen_after",
+    "bank_before", "bank_after",
+) + RISK_FLAGS + ("has_password_manager",)
+
+# Scam quiz scores (0 to 5) take three bits each after the yes/no bits
+SCAM_BITS = 3
+SCAM_SHIFT = {
+    "scam_before": len(BIT_FIELDS),
+    "scam_after": len(BIT_FIELDS) + SCAM_BITS,
+}
+SCAM_MASK = (1 << SCAM_BITS) - 1
+
+# The profile index starts above all answer bits
+PROFILE_SHIFT = len(BIT_FIELDS) + 2 * SCAM_BITS
+ANSWER_MASK = (1 << PROFILE_SHIFT) - 1
+
+FIELD_ORDER = tuple(ANSWER_COLUMNS)
+
+# Distinct (participant_type, age_group, language) combinations seen so far
+PROFILES: list[tuple[str, str, str]] = []
+PROFILE_IDS: dict[tuple[str, str, str], int] = {}
+
+
+def profile_id(participant_type: str, age_group: str, language: str) -> int:
+    key = (participant_type, age_group, language)
+    pid = PROFILE_IDS.get(key)
+    if pid is None:
+        pid = PROFILE_IDS[key] = len(PROFILES)
+        PROFILES.append(key)
+    return pid
+
+
+def pack_bits(values: dict) -> int:
+    """Pack yes/no answers and scam scores (keyed by Answers field) into an int."""
+    bits = 0
+    for i, name in enumerate(BIT_FIELDS):
+        value = int(values.get(name, 0))
+        if value not in (0, 1):
+            raise ValueError(f"{name} must be 0 or 1, got {value}")
+        bits |= value << i
+    for name, shift in SCAM_SHIFT.items():
+        value = int(values.get(name, 0))
+        if not 0 <= value <= SCAM_MASK:
+            raise ValueError(f"{name} must be between 0 and {SCAM_MASK}, got {value}")
+        bits |= value << shift
+    return bits
+
+
+class PackedAnswers(int):
+    __slots__ = ()
+
+    @classmethod
+    def pack(cls, participant_type: str, age_group: str, language: str, bits: int) -> "PackedAnswers":
+        pid = profile_id(participant_type, age_group, language)
+        return cls((pid << PROFILE_SHIFT) | bits)
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "PackedAnswers":
+        """Build from a dict keyed by Answers field names."""
+        return cls.pack(
+            str(values.get("participant_type", "")),
+            str(values.get("age_group", "")),
+            str(values.get("language", "")),
+            pack_bits(values),
+        )
+
+    @classmethod
+    def from_answers(cls, a: Answers) -> "PackedAnswers":
+        return cls.from_dict({name: getattr(a, name) for name in FIELD_ORDER})
+
+    @classmethod
+    def from_row(cls, row: dict) -> "PackedAnswers":
+        """Build from one metrics CSV row as read by csv.DictReader."""
+        values = {}
+        for field, column in ANSWER_COLUMNS.items():
+            raw = row.get(column, "")
+            if field in TEXT_FIELDS:
+                values[field] = raw or ""
+            else:
+                values[field] = int(raw) if str(raw).strip() else 0
+        return cls.from_dict(values)
+
+    @property
+    def bits(self) -> int:
+        """Answer bits without the profile index."""
+        return self & ANSWER_MASK
+
+    @property
+    def profile(self) -> tuple[str, str, str]:
+        return PROFILES[self >> PROFILE_SHIFT]
+
+    @property
+    def participant_type(self) -> str:
+        return self.profile[0]
+
+    @property
+    def age_group(self) -> str:
+        return self.profile[1]
+
+    @property
+    def language(self) -> str:
+        return self.profile[2]
+
+    def to_dict(self) -> dict:
+        """Plain dict keyed by Answers field names.
+
+        This is also the input risk_explanations.build_area_status expects.
+        """
+        return {name: getattr(self, name) for name in FIELD_ORDER}
+
+    def to_answers(self) -> Answers:
+        return Answers(**self.to_dict())
+
+    def to_row(self) -> dict:
+        """Dict keyed by metrics CSV column names (answer columns only)."""
+        return {column: getattr(self, field) for field, column in ANSWER_COLUMNS.items()}
+
+    def __reduce__(self):
+        # Profile indexes are only valid inside this process
+        return (PackedAnswers.pack, self.profile + (self.bits,))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in FIELD_ORDER)
+        return f"PackedAnswers({fields})"
+
+
+def _bit_property(index: int) -> property:
+    return property(lambda self: (self >> index) & 1)
+
+
+def _scam_property(shift: int) -> property:
+    return property(lambda self: (self >> shift) & SCAM_MASK)
+
+
+for _i, _name in enumerate(BIT_FIELDS):
+    setattr(PackedAnswers, _name, _bit_property(_i))
+for _name, _shift in SCAM_SHIFT.items():
+    setattr(PackedAnswers, _name, _scam_property(_shift))
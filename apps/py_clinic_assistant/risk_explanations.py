@@ -1,6 +1,7 @@
 """
 Helpers for SAHAYAM reports in simple language.
 """
+from operator import itemgetter
 
 def build_area_status(before_score, after_score, answers):
     """
@@ -98,6 +99,165 @@ def build_top_actions(status_by_area, answers):
 
     return actions[:3]
 
+# -----------------------------
+# Precomputed tables
+# -----------------------------
+# The status of every area depends on 13 yes/no answers and on which of
+# three bands scam_after falls in, so all 2**13 * 3 outcomes come from 768
+# distinct statuses. Both are built on first use (a few tens of ms);
+# area_outcome then answers with one table lookup.
+
+AREAS = (
+    "Phone basics",
+    "Extra login protection",
+    "Bank and UPI limits",
+    "WiFi and network use",
+    "QR and payment habits",
+    "Apps and updates",
+    "USB and charging",
+    "Passwords and sharing",
+    "Scam messages and calls",
+)
+
+# Answers read by build_area_status, one key bit each. Protections count
+# only when equal to 1, habits whenever they are truthy (as above).
+KEY_PROTECTIONS = ("screen_after", "mfa_after", "bank_after")
+KEY_HABITS = (
+    "os_out_of_date",
+    "used_public_wifi",
+    "has_home_wifi_issues",
+    "used_public_qr_for_payment",
+    "scanned_unknown_qr",
+    "installed_unknown_apps",
+    "inserted_unknown_usb",
+    "used_public_usb_charger",
+    "password_reuse",
+    "shares_device_without_lock",
+)
+KEY_FIELDS = KEY_PROTECTIONS + KEY_HABITS
+SCAM_SHIFT = len(KEY_FIELDS)
+
+class AreaOutcome:
+    """Status per area, snapshot lines and top actions for one status.
+
+    Instances are shared between everyone with the same status, so treat
+    them as read-only.
+    """
+
+    __slots__ = ("status", "snapshot", "actions")
+
+    def __init__(self, status):
+        self.status = status
+        # Everything except the last "Overall today" line, which depends on the category
+        self.snapshot = tuple(build_ascii_snapshot(status, "")[:-1])
+        self.actions = tuple(build_top_actions(status, {}))
+
+    def snapshot_lines(self, overall_cat_after):
+        return list(self.snapshot) + [f"Overall today: {overall_cat_after} risk"]
+
+def scam_band(scam_after):
+    """0, 1 or 2 for scam quiz scores giving "fix", "watch" or "ok"."""
+    if scam_after <= 2:
+        return 0
+    if scam_after <= 3:
+        return 1
+    return 2
+
+def status_key(answers):
+    """Index into the outcome_tables() key table for an answers dict."""
+    get = answers.get
+    key = 0
+    for i, name in enumerate(KEY_PROTECTIONS):
+        if get(name, 0) == 1:
+            key |= 1 << i
+    for i, name in enumerate(KEY_HABITS, len(KEY_PROTECTIONS)):
+        if get(name, 0):
+            key |= 1 << i
+    return key | scam_band(get("scam_after", 0)) << SCAM_SHIFT
+
+SCAM_AREA = "Scam messages and calls"
+
+def _build_tables():
+    # The scam band only changes the scam area, so run build_area_status
+    # once per combination of yes/no answers and once per band
+    band_tags = [build_area_status(0, 0, {"scam_after": s})[SCAM_AREA] for s in (2, 3, 4)]
+    outcomes = {}  # status as a tuple in AREAS order -> AreaOutcome
+    by_key = [None] * (3 << SCAM_SHIFT)
+    other_areas = AREAS[:-1]
+    for flags in range(1 << SCAM_SHIFT):
+        answers = dict(zip(KEY_FIELDS, map(int, format(flags, "013b")[::-1])))
+        status = build_area_status(0, 0, answers)
+        base = tuple(map(status.__getitem__, other_areas))
+        for band, tag in enumerate(band_tags):
+            tags = base + (tag,)
+            outcome = outcomes.get(tags)
+            if outcome is None:
+                outcome = outcomes[tags] = AreaOutcome(dict(zip(AREAS, tags)))
+            by_key[band << SCAM_SHIFT | flags] = outcome
+    return list(outcomes.values()), by_key
+
+_tables = None
+
+def outcome_tables():
+    """(distinct outcomes, outcome by status_key), built on first use."""
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+# Raw answer values -> outcome, in front of the key table; answers are
+# small integers, so only a handful of distinct tuples ever turn up
+_GET_VALUES = itemgetter(*KEY_FIELDS, "scam_after")
+_by_values = {}
+MAX_CACHED = 65536
+
+def area_outcome(answers):
+    """Same status, snapshot and actions as build_area_status and friends, from one lookup."""
+    try:
+        values = _GET_VALUES(answers)
+    except (KeyError, TypeError):
+        return outcome_tables()[1][status_key(answers)]
+    outcome = _by_values.get(values)
+    if outcome is None:
+        outcome = outcome_tables()[1][status_key(answers)]
+        if len(_by_values) < MAX_CACHED:
+            _by_values[values] = outcome
+    return outcome
+
+def area_outcomes(cols):
+    """AreaOutcome for every participant in batch_scoring style columns.
+
+    cols maps Answers field names to equal-length sequences of 0/1 (and
+    0-5 for scam_after), as made by batch_scoring.columns_from_rows. NumPy
+    arrays are handled with whole-array operations.
+    """
+    by_key = outcome_tables()[1]
+    scam = cols["scam_after"]
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None and isinstance(scam, np.ndarray):
+        keys = np.zeros(len(scam), dtype=np.int64)
+        for i, name in enumerate(KEY_PROTECTIONS):
+            keys |= (np.asarray(cols[name]) == 1).astype(np.int64) << i
+        for i, name in enumerate(KEY_HABITS, len(KEY_PROTECTIONS)):
+            keys |= (np.asarray(cols[name]) != 0).astype(np.int64) << i
+        keys |= np.digitize(scam, (3, 4)).astype(np.int64) << SCAM_SHIFT
+        return list(map(by_key.__getitem__, keys.tolist()))
+
+    # By scam quiz score 0..5; scores outside that are clamped, giving the
+    # same band as scam_band and the NumPy path above
+    bands = [0, 0, 0, 1, 2, 2]
+    keys = [bands[min(5, max(0, s))] << SCAM_SHIFT for s in scam]
+    for i, name in enumerate(KEY_FIELDS):
+        bit = 1 << i
+        if i < len(KEY_PROTECTIONS):
+            keys = [k | bit if v == 1 else k for k, v in zip(keys, cols[name])]
+        else:
+            keys = [k | bit if v else k for k, v in zip(keys, cols[name])]
+    return list(map(by_key.__getitem__, keys))
+
 # Old names kept so earlier imports do not break
 def build_exposure_lines(*_, **__): return []
 def build_protection_lines(*_, **__): return []
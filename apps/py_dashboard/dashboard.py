@@ -1,14 +1,25 @@
-import subprocess
 import sys
 from pathlib import Path
 
 # Point to project root (project-sahayam folder)
 ROOT = Path(__file__).resolve().parents[2]
 
-def run(cmd, cwd=None):
-    """Run a command and show what is happening."""
-    print("\n>>>", " ".join(cmd))
-    subprocess.run(cmd, cwd=str(cwd) if cwd else None)
+# The tools run inside this process, so they are imported once and stay
+# warm between menu choices instead of starting a new Python each time
+sys.path.insert(0, str(ROOT / "apps" / "py_metrics_logger"))
+sys.path.insert(0, str(ROOT / "apps" / "py_clinic_assistant"))
+import clinic_assistant  # noqa: E402
+import summarize_metrics  # noqa: E402
+
+def run(name, func, *args):
+    """Run one tool and show what is happening; errors do not close the menu."""
+    print("\n>>>", name)
+    try:
+        func(*args)
+    except (KeyboardInterrupt, EOFError):
+        print("\nStopped", name)
+    except Exception as exc:
+        print(f"\n{name} stopped with an error: {exc}")
 
 def show_menu():
     print("\nSAHAYAM assistant")
@@ -41,16 +52,10 @@ def main():
         choice = show_menu()
 
         if choice == "1":
-            run(
-                [sys.executable, "clinic_assistant.py"],
-                cwd=ROOT / "apps" / "py_clinic_assistant"
-            )
+            run("clinic session", clinic_assistant.main, [])
 
         elif choice == "2":
-            run(
-                [sys.executable, "summarize_metrics.py"],
-                cwd=ROOT / "apps" / "py_metrics_logger"
-            )
+            run("metrics summary", summarize_metrics.main, [])
 
         elif choice == "3":
             list_reports()
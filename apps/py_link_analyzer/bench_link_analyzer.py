@@ -0,0 +1,49 @@
+"""
+Throughput of analyze_url on synthetic URL dumps.
+
+    python bench_link_analyzer.py              # 1,000,000 URLs
+    python bench_link_analyzer.py --count 100000
+"""
+import argparse
+import random
+import time
+
+from link_analyzer import analyze_url
+
+HOSTS = [
+    "google.com", "accounts.google.com", "login.google.com", "web.whatsapp.com",
+    "bit.ly", "tinyurl.com", "t.co", "goo.gl", "x.bit.ly",
+    "sbi-kyc-update.top", "secure-login.example.cn", "verify.bank.example.ru",
+    "refund.support.pay.work", "win-prize.click", "192.168.1.20", "10.0.0.5:8080",
+    "a.b.c.example.com", "india.gov.in", "support-irctc.co.in", "paytm.com",
+]
+PATHS = ["", "/", "/kyc", "/pay?id=123", "/verify-now", "/refund/claim", "/a/b/c"]
+
+
+def make_urls(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    urls = []
+    for i in range(n):
+        host = rng.choice(HOSTS)
+        # Some unique hosts so results are not all from a handful of domains
+        if i % 4 == 0:
+            host = f"m{i % 5000}.{host}"
+        scheme = rng.choice(["https://", "http://", ""])
+        urls.append(scheme + host + rng.choice(PATHS))
+    return urls
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark link_analyzer.analyze_url.")
+    ap.add_argument("--count", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    urls = make_urls(args.count)
+    t0 = time.perf_counter()
+    flagged = sum(1 for u in urls if analyze_url(u)["score"] > 0)
+    elapsed = time.perf_counter() - t0
+    print(f"Analyzed {args.count} URLs in {elapsed:.2f} s ({args.count / elapsed:,.0f} URLs/s), flagged {flagged}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,404 @@
 import re
+import sys
+import json
+import sqlite3
+import hashlib
 import argparse
-from urllib.parse import urlparse
+from collections import OrderedDict, deque
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from reputation_index import ReputationIndex
 
 SUSPICIOUS_TLDS = {".cn", ".ru", ".top", ".work", ".click"}
 SHORTENERS = {"bit.ly", "tinyurl.com", "t.co", "goo.gl"}
+BAIT_WORDS = ["support", "verify", "secure", "login", "update"]
+# Subdomains of these are not flagged for bait words
+BAIT_ALLOWLIST = {".google.com", ".whatsapp.com"}
 
-def analyze_url(url: str) -> dict:
-    info = {"url": url, "score": 0, "reasons": []}
-    try:
-        parsed = urlparse(url if "://" in url else "http://" + url)
-    except Exception:
-        info["reasons"].append("parse_error")
-        info["score"] += 1
-        return info
+# Optional offline reputation lists (see reputation_index.py and load_reputation)
+BLOCKLIST = None
+ALLOWLIST = None
 
-    host = parsed.netloc.lower()
+IP_HOST_RE = re.compile(r"\d{1,3}(\.\d{1,3}){3}")
+
+
+class SuffixTrie:
+    """Domain suffixes stored by reversed labels (com -> google -> ...).
+
+    Matching walks the labels of a host from the right once, instead of
+    calling endswith for every listed suffix.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, suffix: str, tag, subdomains_only: bool):
+        """Register a suffix such as ".cn" or "bit.ly".
+
+        With subdomains_only the host must have at least one more label in
+        front (".cn" matches "a.cn" but not "cn"); otherwise the suffix
+        also matches on its own ("bit.ly" and "x.bit.ly").
+        """
+        node = self.root
+        for label in reversed(suffix.lstrip(".").split(".")):
+            node = node.setdefault(label, {})
+        node.setdefault(None, []).append((tag, subdomains_only))
+
+    def match(self, host: str) -> list:
+        """Tags of every registered suffix the host ends with."""
+        labels = host.split(".")
+        node = self.root
+        found = []
+        for depth, label in enumerate(reversed(labels), 1):
+            node = node.get(label)
+            if node is None:
+                break
+            for tag, subdomains_only in node.get(None, ()):
+                if not subdomains_only or depth < len(labels):
+                    found.append(tag)
+        return found
+
+
+def compile_domain_rules() -> SuffixTrie:
+    trie = SuffixTrie()
+    for t in SUSPICIOUS_TLDS:
+        trie.add(t, ("tld", t), subdomains_only=True)
+    for s in SHORTENERS:
+        trie.add(s, ("shortener", s), subdomains_only=False)
+    for a in BAIT_ALLOWLIST:
+        trie.add(a, ("allow", a), subdomains_only=True)
+    return trie
+
+
+def compile_bait_words(words) -> re.Pattern:
+    """One pattern that finds every bait word in a single scan.
+
+    The lookahead reports overlapping matches too, so the caller can pick
+    the word listed first, as the original per-word loop did.
+    """
+    return re.compile("(?=(" + "|".join(map(re.escape, words)) + "))")
+
+
+DOMAIN_RULES = compile_domain_rules()
+BAIT_RE = compile_bait_words(BAIT_WORDS)
+BAIT_RANK = {w: i for i, w in enumerate(BAIT_WORDS)}
+
+
+def load_reputation(blocklist=None, allowlist=None):
+    """Use compiled reputation index files for every following analysis."""
+    global BLOCKLIST, ALLOWLIST
+    BLOCKLIST = ReputationIndex(blocklist) if blocklist else None
+    ALLOWLIST = ReputationIndex(allowlist) if allowlist else None
+
+
+def host_verdict(host: str) -> tuple[int, tuple[str, ...]]:
+    """Score and reasons for a lower-cased host (the netloc of a URL)."""
+    score = 0
+    reasons = []
+
+    if BLOCKLIST is not None or ALLOWLIST is not None:
+        hostname = host.rpartition("@")[2].split(":")[0]
+        if ALLOWLIST is not None and ALLOWLIST.match(hostname):
+            return 0, ("allowlisted",)
+        if BLOCKLIST is not None and BLOCKLIST.match(hostname):
+            reasons.append("blocklisted")
+            score += 4
 
     # 1) IP address in host
-    if re.fullmatch(r"\d{1,3}(\.\d{1,3}){3}", host.split(":")[0]):
-        info["reasons"].append("ip_host")
-        info["score"] += 2
+    if IP_HOST_RE.fullmatch(host.split(":")[0]):
+        reasons.append("ip_host")
+        score += 2
+
+    tld = shortener = allowed = None
+    for kind, value in DOMAIN_RULES.match(host):
+        if kind == "tld":
+            tld = value
+        elif kind == "shortener":
+            shortener = value
+        else:
+            allowed = value
 
     # 2) Suspicious TLD
-    for t in SUSPICIOUS_TLDS:
-        if host.endswith(t):
-            info["reasons"].append(f"suspicious_tld({t})")
-            info["score"] += 2
-            break
+    if tld:
+        reasons.append(f"suspicious_tld({tld})")
+        score += 2
 
     # 3) URL shorteners
-    for s in SHORTENERS:
-        if host == s or host.endswith("." + s):
-            info["reasons"].append("shortener")
-            info["score"] += 2
-            break
+    if shortener:
+        reasons.append("shortener")
+        score += 2
 
     # 4) Excessive subdomains
     if host.count(".") >= 3:
-        info["reasons"].append("many_subdomains")
-        info["score"] += 1
+        reasons.append("many_subdomains")
+        score += 1
 
     # 5) Bait words
-    bait_words = ["support", "verify", "secure", "login", "update"]
-    for w in bait_words:
-        if w in host and not host.endswith(".google.com") and not host.endswith(".whatsapp.com"):
-            info["reasons"].append(f"bait_word({w})")
-            info["score"] += 1
-            break
+    if not allowed:
+        hits = BAIT_RE.findall(host)
+        if hits:
+            w = min(hits, key=BAIT_RANK.__getitem__)
+            reasons.append(f"bait_word({w})")
+            score += 1
+
+    return score, tuple(reasons)
+
+
+def rules_fingerprint() -> str:
+    """Changes whenever the rule tables change, so old cached verdicts are dropped."""
+    rules = (
+        sorted(SUSPICIOUS_TLDS), sorted(SHORTENERS), BAIT_WORDS, sorted(BAIT_ALLOWLIST),
+        BLOCKLIST.digest if BLOCKLIST is not None else None,
+        ALLOWLIST.digest if ALLOWLIST is not None else None,
+    )
+    return hashlib.sha1(repr(rules).encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """Host -> (score, reasons) with LRU eviction and an optional SQLite file.
+
+    Scam domains and shortener hosts repeat across thousands of messages,
+    so each host is scored once. With a path, verdicts are also looked up
+    in and saved to a SQLite file so the next run starts warm; the file is
+    cleared when the rules change. A readonly cache (used by worker
+    processes) only reads the file and leaves saving to take_new/save in
+    the parent.
+    """
+
+    FLUSH_EVERY = 10_000
 
+    def __init__(self, maxsize=100_000, path=None, readonly=False):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.new = []
+        self.path = path
+        self.readonly = readonly
+        self.db = self._open_db(path) if path else None
+
+    def _open_db(self, path):
+        if self.readonly:
+            try:
+                db = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+                row = db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None or row[0] != rules_fingerprint():
+                db.close()
+                return None
+            return db
+
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS verdicts (host TEXT PRIMARY KEY, score INTEGER, reasons TEXT)")
+        row = db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        fingerprint = rules_fingerprint()
+        if row is None or row[0] != fingerprint:
+            db.execute("DELETE FROM verdicts")
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (fingerprint,))
+            db.commit()
+        return db
+
+    def verdict(self, host: str) -> tuple[int, tuple[str, ...]]:
+        found = self.entries.get(host)
+        if found is not None:
+            self.hits += 1
+            self.entries.move_to_end(host)
+            return found
+        if self.db is not None:
+            row = self.db.execute("SELECT score, reasons FROM verdicts WHERE host = ?", (host,)).fetchone()
+            if row is not None:
+                self.hits += 1
+                found = (row[0], tuple(r for r in row[1].split("\n") if r))
+                self._remember(host, found)
+                return found
+
+        self.misses += 1
+        found = host_verdict(host)
+        self._remember(host, found)
+        if self.path:
+            self.new.append((host, found))
+            if not self.readonly and len(self.new) >= self.FLUSH_EVERY:
+                self.save(self.take_new())
+        return found
+
+    def _remember(self, host, found):
+        if self.maxsize <= 0:
+            return
+        self.entries[host] = found
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def take_new(self):
+        """Verdicts computed since the last call that are not saved yet."""
+        new, self.new = self.new, []
+        return new
+
+    def save(self, entries):
+        if self.db is None or self.readonly or not entries:
+            return
+        self.db.executemany(
+            "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?)",
+            [(host, score, "\n".join(reasons)) for host, (score, reasons) in entries],
+        )
+        self.db.commit()
+
+    def close(self):
+        self.save(self.take_new())
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+def analyze_url(url: str, cache: VerdictCache = None) -> dict:
+    info = {"url": url, "score": 0, "reasons": []}
+    try:
+        # urlsplit gives the same netloc as urlparse without splitting ;params
+        parsed = urlsplit(url if "://" in url else "http://" + url)
+    except Exception:
+        info["reasons"].append("parse_error")
+        info["score"] += 1
+        return info
+
+    host = parsed.netloc.lower()
+    score, reasons = cache.verdict(host) if cache is not None else host_verdict(host)
+    info["score"] = score
+    info["reasons"] = list(reasons)
     return info
 
+def iter_urls(lines):
+    """Non-empty, stripped URLs from an iterable of lines (read lazily)."""
+    for line in lines:
+        url = line.strip()
+        if url:
+            yield url
+
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Cache used inside each worker process (see _init_worker)
+_worker_cache = None
+
+
+def _init_worker(cache_size, cache_file, blocklist, allowlist):
+    global _worker_cache
+    load_reputation(blocklist, allowlist)
+    # Workers only read the SQLite file; the parent saves what they compute
+    _worker_cache = VerdictCache(cache_size, cache_file, readonly=True)
+
+
+def _analyze_chunk(urls):
+    cache = _worker_cache
+    hits, misses = cache.hits, cache.misses
+    # Only score and reasons travel back; the parent still has the URLs
+    results = [(info["score"], info["reasons"]) for info in (analyze_url(u, cache) for u in urls)]
+    return results, cache.hits - hits, cache.misses - misses, cache.take_new()
+
+
+def analyze_stream(urls, jobs=1, chunk_size=5000, cache: VerdictCache = None):
+    """Yield analyze_url results for an iterable of URLs, in input order.
+
+    With jobs > 1, chunks of URLs are scored on a process pool. Only a few
+    chunks per worker are in flight at a time, so memory stays bounded
+    however large the input is. Each worker keeps its own in-memory cache;
+    their hit and miss counts are added to the given cache.
+    """
+    cache = cache if cache is not None else VerdictCache(0)
+    if jobs <= 1:
+        for url in urls:
+            yield analyze_url(url, cache)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(
+            cache.maxsize,
+            cache.path,
+            BLOCKLIST.path if BLOCKLIST is not None else None,
+            ALLOWLIST.path if ALLOWLIST is not None else None,
+        ),
+    ) as pool:
+        pending = deque()
+        for chunk in iter_chunks(urls, chunk_size):
+            pending.append((chunk, pool.submit(_analyze_chunk, chunk)))
+            if len(pending) > 2 * jobs:
+                yield from _chunk_results(cache, *pending.popleft())
+        while pending:
+            yield from _chunk_results(cache, *pending.popleft())
+
+
+def _chunk_results(cache, chunk, future):
+    results, hits, misses, new = future.result()
+    cache.hits += hits
+    cache.misses += misses
+    cache.save(new)
+    for url, (score, reasons) in zip(chunk, results):
+        yield {"url": url, "score": score, "reasons": list(reasons)}
+
+
+def format_result(info: dict) -> str:
+    if info["score"] > 0:
+        sev = "HIGH" if info["score"] >= 4 else "MEDIUM" if info["score"] >= 2 else "LOW"
+        return f"[{sev}] {info['url']}  reasons={','.join(info['reasons'])}"
+    return f"[OK ] {info['url']}"
+
+
 def main():
     ap = argparse.ArgumentParser(description="Offline URL risk analyzer for clinics.")
     ap.add_argument("file", help="Text file with one URL per line")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="worker processes; input is streamed in chunks (default: 1)")
+    ap.add_argument("--chunk-size", type=int, default=5000,
+                    help="URLs per chunk sent to a worker (default: 5000)")
+    ap.add_argument("--jsonl", action="store_true",
+                    help="write one JSON object per URL instead of text lines")
+    ap.add_argument("--cache-size", type=int, default=100_000,
+                    help="hosts kept in the in-memory verdict cache, 0 to disable (default: 100000)")
+    ap.add_argument("--cache-file",
+                    help="SQLite file that keeps host verdicts between runs")
+    ap.add_argument("--blocklist",
+                    help="reputation index of known bad domains (build with reputation_index.py)")
+    ap.add_argument("--allowlist",
+                    help="reputation index of trusted domains, never flagged")
     args = ap.parse_args()
 
-    with open(args.file, encoding="utf-8") as f:
-        urls = [line.strip() for line in f if line.strip()]
+    load_reputation(args.blocklist, args.allowlist)
 
-    total = len(urls)
+    total = 0
     flagged = 0
-    for u in urls:
-        info = analyze_url(u)
-        if info["score"] > 0:
-            flagged += 1
-            sev = "HIGH" if info["score"] >= 4 else "MEDIUM" if info["score"] >= 2 else "LOW"
-            print(f"[{sev}] {u}  reasons={','.join(info['reasons'])}")
-        else:
-            print(f"[OK ] {u}")
+    out = sys.stdout
+    cache = VerdictCache(args.cache_size, args.cache_file)
+    with open(args.file, encoding="utf-8") as f:
+        for info in analyze_stream(iter_urls(f), args.jobs, args.chunk_size, cache):
+            total += 1
+            if info["score"] > 0:
+                flagged += 1
+            if args.jsonl:
+                out.write(json.dumps(info, ensure_ascii=False) + "\n")
+            else:
+                out.write(format_result(info) + "\n")
+
+    cache.close()
 
-    print(f"\nAnalyzed {total} URLs, flagged {flagged} as suspicious.")
+    summary = (
+        f"\nAnalyzed {total} URLs, flagged {flagged} as suspicious "
+        f"(cache hits {cache.hits}, misses {cache.misses})."
+    )
+    # Keep stdout valid JSON Lines; the summary goes to stderr instead
+    print(summary, file=sys.stderr if args.jsonl else sys.stdout)
 
 if __name__ == "__main__":
     main()
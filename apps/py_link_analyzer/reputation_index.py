@@ -0,0 +1,123 @@
+"""
+Compact, memory-mapped domain reputation index for link_analyzer.
+
+Plain text lists (one domain per line, "#" comments, hosts-file lines
+like "0.0.0.0 bad.example" also work) are compiled into a sorted array of
+64-bit domain hashes. Opening the index only maps the file, so startup is
+instant even for millions of domains, and each lookup is a binary search.
+
+Usage:
+  python reputation_index.py build feed1.txt feed2.txt -o blocklist.idx
+  python reputation_index.py check blocklist.idx login.bad.example
+"""
+import argparse
+import bisect
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"SAHREP1\x00"
+# magic, byte order (0 little, 1 big), entry count, digest of all entries
+HEADER = struct.Struct("<8sBQ16s")
+
+
+def domain_hash(domain: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(domain.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def normalise_domain(text: str) -> str:
+    """Domain from one list line, or "" for comments and blank lines."""
+    text = text.split("#", 1)[0].strip()
+    if not text:
+        return ""
+    # hosts-file style: "0.0.0.0 domain"
+    domain = text.split()[-1].lower()
+    if domain.startswith("*."):
+        domain = domain[2:]
+    return domain.strip(".")
+
+
+def read_domains(paths):
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                domain = normalise_domain(line)
+                if domain:
+                    yield domain
+
+
+def build_index(paths, out) -> int:
+    """Compile text lists into an index file; returns the number of domains."""
+    hashes = array("Q", sorted({domain_hash(d) for d in read_domains(paths)}))
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=16).digest()
+    with open(out, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0 if sys.byteorder == "little" else 1, len(hashes), digest))
+        hashes.tofile(f)
+    return len(hashes)
+
+
+class ReputationIndex:
+    """Read-only view of an index file built by build_index."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, order, count, digest = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a reputation index")
+        if order != (0 if sys.byteorder == "little" else 1):
+            raise ValueError(f"{self.path} was built on a machine with a different byte order")
+        self.count = count
+        self.digest = digest.hex()
+        self._hashes = memoryview(self._map)[HEADER.size:HEADER.size + 8 * count].cast("Q")
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, domain: str) -> bool:
+        h = domain_hash(domain)
+        i = bisect.bisect_left(self._hashes, h)
+        return i < self.count and self._hashes[i] == h
+
+    def match(self, host: str) -> str:
+        """The listed domain that host equals or is a subdomain of, or ""."""
+        labels = host.strip(".").split(".")
+        for i in range(len(labels)):
+            candidate = ".".join(labels[i:])
+            if candidate in self:
+                return candidate
+        return ""
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Domain reputation index for link_analyzer.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="compile text domain lists into an index")
+    build.add_argument("lists", nargs="+")
+    build.add_argument("-o", "--out", required=True)
+
+    check = sub.add_parser("check", help="look up hosts in an index")
+    check.add_argument("index")
+    check.add_argument("hosts", nargs="+")
+
+    args = ap.parse_args()
+    if args.command == "build":
+        count = build_index(args.lists, args.out)
+        print(f"Written {count} domains to {args.out}")
+        return
+
+    index = ReputationIndex(args.index)
+    for host in args.hosts:
+        found = index.match(host.lower())
+        print(f"{host}: {'listed as ' + found if found else 'not listed'}")
+
+
+if __name__ == "__main__":
+    main()
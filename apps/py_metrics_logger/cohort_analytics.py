@@ -0,0 +1,260 @@
+"""
+Per-cohort breakdown of the metrics CSVs.
+
+Adoption and scam-score numbers like summarize_metrics prints, but for each
+participant type, age group, language, session, date, month or risk
+category change (e.g. "high->medium"), and for combinations of them.
+
+Everything is computed in one pass over the files. Rows are counted by the
+values of just the columns the report needs (a hash aggregation done by
+Counter in C, without a dict per row); each distinct combination is then
+turned into numbers once and added to its cohorts. A year of data from several
+sites (millions of rows) takes seconds. Files written by log_session.py
+and by the clinic can be mixed (see metrics_schema).
+
+Usage:
+  python cohort_analytics.py                               # baseline_vs_week1.csv
+  python cohort_analytics.py a.csv b.csv --by participant_type,risk_transition
+  python cohort_analytics.py --by month --by age_group --csv cohorts.csv --json cohorts.json
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+import metrics_schema
+
+ROOT = Path(__file__).resolve().parents[2]
+METRICS_CSV = ROOT / "metrics" / "baseline_vs_week1.csv"
+
+# Cohort dimensions, each made from one or more CSV columns
+DIMENSIONS = {
+    "participant_type": ("participant_type",),
+    "age_group": ("age_group",),
+    "language": ("language",),
+    "session_id": ("session_id",),
+    "date": ("date",),
+    "month": ("date",),
+    "risk_transition": ("risk_category_before", "risk_category_after"),
+}
+DEFAULT_GROUPINGS = [
+    ("participant_type",),
+    ("age_group",),
+    ("language",),
+    ("date",),
+    ("risk_transition",),
+]
+
+# Columns behind the numbers, as pairs of (before, after)
+MEASURE_COLUMNS = [
+    ("mfa_before", "mfa_after"),
+    ("screen_lock_before", "screen_lock_after"),
+    ("bank_limit_before", "bank_limit_after"),
+    ("scam_quiz_score_before", "scam_quiz_score_after"),
+    ("risk_score_before", "risk_score_after"),
+]
+# Totals kept per cohort, in this order. Risk scores are averaged only
+# over rows that have both (log_session.py does not record them)
+TOTALS = ["participants", "mfa_adopted", "screen_adopted", "bank_adopted",
+          "scam_gain", "risk_rows", "risk_before", "risk_after"]
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def dimension_value(dim, values):
+    """Cohort label for dim from the values of its columns."""
+    if dim == "month":
+        return values[0][:7]
+    if dim == "risk_transition":
+        before, after = (v.strip().lower() or "?" for v in values)
+        return f"{before}->{after}"
+    return values[0].strip()
+
+
+def count_combinations(paths, columns):
+    """Counter of tuples of the given canonical columns' values over all rows.
+
+    Files of every metrics_schema layout can be mixed; a column missing
+    from a file counts as "" for its rows.
+    """
+    return Counter(metrics_schema.read_columns(paths, columns))
+
+
+def cohort_totals(paths, groupings=DEFAULT_GROUPINGS):
+    """{grouping: {labels: totals list in TOTALS order}}, after an "all" grouping ()."""
+    dims = sorted({d for grouping in groupings for d in grouping})
+    columns = []
+    for dim in dims:
+        for column in DIMENSIONS[dim]:
+            if column not in columns:
+                columns.append(column)
+    first_measure = len(columns)
+    for pair in MEASURE_COLUMNS:
+        columns.extend(pair)
+    dim_columns = {dim: [columns.index(c) for c in DIMENSIONS[dim]] for dim in dims}
+
+    result = {(): {(): [0] * len(TOTALS)}}
+    result.update((grouping, {}) for grouping in groupings)
+    for key, n in count_combinations(paths, columns).items():
+        measures = [to_int(v) for v in key[first_measure:]]
+        mfa_b, mfa_a, screen_b, screen_a, bank_b, bank_a, scam_b, scam_a, risk_b, risk_a = measures
+        has_risk = all(v.strip() for v in key[-2:])
+        adds = (
+            n,
+            n if mfa_a - mfa_b == 1 else 0,
+            n if screen_a - screen_b == 1 else 0,
+            n if bank_a - bank_b == 1 else 0,
+            n * (scam_a - scam_b),
+            n if has_risk else 0,
+            n * risk_b if has_risk else 0,
+            n * risk_a if has_risk else 0,
+        )
+        labels = {dim: dimension_value(dim, [key[i] for i in dim_columns[dim]]) for dim in dims}
+        for grouping, cohorts in result.items():
+            cohort = tuple(labels[dim] for dim in grouping)
+            totals = cohorts.get(cohort)
+            if totals is None:
+                cohorts[cohort] = list(adds)
+            else:
+                for i, v in enumerate(adds):
+                    totals[i] += v
+    return result
+
+
+def cohort_stats(totals):
+    """Percentages and means for one cohort, same names as summarize_metrics.
+
+    The risk means are None when no row in the cohort has risk scores.
+    """
+    participants = totals[0]
+    if not participants:
+        return {"total": 0}
+    _, mfa, screen, bank, scam, risk_rows, risk_b, risk_a = totals
+    return {
+        "total": participants,
+        "mfa_pct": 100.0 * mfa / participants,
+        "screen_pct": 100.0 * screen / participants,
+        "bank_pct": 100.0 * bank / participants,
+        "scam_mean": scam / participants,
+        "risk_rows": risk_rows,
+        "risk_before_mean": risk_b / risk_rows if risk_rows else None,
+        "risk_after_mean": risk_a / risk_rows if risk_rows else None,
+    }
+
+
+TIME_DIMENSIONS = {"session_id", "date", "month"}
+
+
+def report_rows(result):
+    """Flat rows (dict per cohort) for every grouping.
+
+    Cohorts by date, month or session come in time order, the others
+    biggest first.
+    """
+    for grouping, cohorts in result.items():
+        if grouping and set(grouping) <= TIME_DIMENSIONS:
+            ordered = sorted(cohorts.items())
+        else:
+            ordered = sorted(cohorts.items(), key=lambda item: (-item[1][0], item[0]))
+        for labels, totals in ordered:
+            row = {"grouping": "+".join(grouping) or "all"}
+            row.update(zip(grouping, labels))
+            row.update(cohort_stats(totals))
+            yield row
+
+
+STAT_COLUMNS = ["total", "mfa_pct", "screen_pct", "bank_pct",
+                "scam_mean", "risk_rows", "risk_before_mean", "risk_after_mean"]
+
+
+def write_csv(rows, path, dims):
+    with Path(path).open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["grouping"] + dims + STAT_COLUMNS, restval="")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()})
+
+
+def print_report(rows):
+    current = None
+    for row in rows:
+        if row["grouping"] != current:
+            current = row["grouping"]
+            print(f"\n--- by {current} ---")
+            print(f"{'cohort':<28}{'people':>8}{'MFA %':>8}{'lock %':>8}{'bank %':>8}"
+                  f"{'scam +':>8}{'risk':>12}")
+        labels = [v or "(blank)" for k, v in row.items() if k not in STAT_COLUMNS and k != "grouping"]
+        name = " / ".join(labels) or "everyone"
+        if not row["total"]:
+            print(f"{name:<28}{0:>8}")
+            continue
+        if row["risk_rows"]:
+            risk = f"{row['risk_before_mean']:.1f}->{row['risk_after_mean']:.1f}"
+        else:
+            risk = "n/a"
+        print(f"{name[:27]:<28}{row['total']:>8}{row['mfa_pct']:>8.1f}{row['screen_pct']:>8.1f}"
+              f"{row['bank_pct']:>8.1f}{row['scam_mean']:>8.2f}{risk:>12}")
+
+
+def parse_groupings(specs):
+    """["participant_type,risk_transition", "date"] -> [(... , ...), ("date",)]"""
+    groupings = []
+    for spec in specs:
+        grouping = tuple(d.strip() for d in spec.split(",") if d.strip())
+        unknown = [d for d in grouping if d not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"unknown dimension {', '.join(unknown)} "
+                             f"(choose from {', '.join(DIMENSIONS)})")
+        if grouping and grouping not in groupings:
+            groupings.append(grouping)
+    return groupings
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Per-cohort SAHAYAM metrics.")
+    ap.add_argument("files", nargs="*",
+                    help="metrics CSV files to combine, or - for stdin (default: baseline_vs_week1.csv)")
+    ap.add_argument("--by", action="append", metavar="DIMS",
+                    help="cohorts to report, comma-separated for a cross-tab; repeat for several "
+                         f"(dimensions: {', '.join(DIMENSIONS)})")
+    ap.add_argument("--csv", help="also write every cohort to this CSV file")
+    ap.add_argument("--json", help="also write every cohort to this JSON file")
+    ap.add_argument("--quiet", action="store_true", help="do not print the tables")
+    args = ap.parse_args(argv)
+
+    try:
+        groupings = parse_groupings(args.by) if args.by else DEFAULT_GROUPINGS
+    except ValueError as e:
+        ap.error(str(e))
+
+    files = args.files or [str(METRICS_CSV)]
+    missing = [p for p in files if p != "-" and not Path(p).exists()]
+    for p in missing:
+        print("No metrics file found at", p)
+    files = [p for p in files if p not in missing]
+    if not files:
+        return 1
+
+    rows = list(report_rows(cohort_totals(files, groupings)))
+    if not args.quiet:
+        print("=== SAHAYAM cohort breakdown ===")
+        print("File:", ", ".join("stdin" if p == "-" else p for p in files))
+        print_report(rows)
+    if args.csv:
+        dims = [d for d in DIMENSIONS if any(d in g for g in groupings)]
+        write_csv(rows, args.csv, dims)
+        print("\nCohorts written to", args.csv)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+        print("\nCohorts written to", args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
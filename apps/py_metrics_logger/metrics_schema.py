@@ -0,0 +1,180 @@
+"""
+One reader for the three metrics CSV layouts.
+
+The same metrics folder gets files from three writers with different
+column names:
+
+- clinic: clinic_assistant.py and generate_synthetic_metrics.py
+  (screen_lock_before, language, scam_quiz_score_before, ...), the names
+  used everywhere else and called canonical here;
+- logger: log_session.py (screenlock_before, banklimit_before,
+  scam_score_before, lang);
+- synthetic: generate_synthetic_dataset.py (clinic names, but
+  fell_for_social_link).
+
+The layout is detected from the header once per file. An Extractor then
+pulls the wanted columns, by canonical name, out of each csv.reader row
+with one itemgetter call, so no dict is built per row. Columns a layout
+does not have read as "".
+
+Usage:
+  python metrics_schema.py a.csv b.csv     # print each file's layout
+"""
+import argparse
+import csv
+import hashlib
+import sys
+from itertools import repeat
+from operator import add, itemgetter
+from pathlib import Path
+
+# Column names of other layouts -> canonical (clinic) names
+LAYOUT_ALIASES = {
+    "clinic": {},
+    "logger": {
+        "lang": "language",
+        "screenlock_before": "screen_lock_before",
+        "screenlock_after": "screen_lock_after",
+        "banklimit_before": "bank_limit_before",
+        "banklimit_after": "bank_limit_after",
+        "scam_score_before": "scam_quiz_score_before",
+        "scam_score_after": "scam_quiz_score_after",
+    },
+    "synthetic": {
+        "fell_for_social_link": "fell_for_social_link_or_call",
+    },
+}
+
+# A column only that layout writes
+LAYOUT_MARKERS = [
+    ("logger", "screenlock_before"),
+    ("synthetic", "fell_for_social_link"),
+    ("clinic", "screen_lock_before"),
+]
+
+
+def detect_layout(header) -> str:
+    """"clinic", "logger", "synthetic" or "unknown" for a CSV header."""
+    names = set(header)
+    for layout, marker in LAYOUT_MARKERS:
+        if marker in names:
+            return layout
+    return "unknown"
+
+
+def canonical_header(header, layout: str = None) -> list:
+    """The header with every column renamed to its canonical name."""
+    aliases = LAYOUT_ALIASES.get(layout or detect_layout(header), {})
+    return [aliases.get(name.strip(), name.strip()) for name in header]
+
+
+class Extractor:
+    """Picks columns by canonical name out of rows of one CSV layout.
+
+    rows(reader) turns csv.reader rows into tuples of the wanted columns,
+    in the order given. Blank lines are skipped, as csv.DictReader does;
+    cells missing from short rows and columns the layout lacks are "".
+    """
+
+    def __init__(self, header, columns):
+        self.layout = detect_layout(header)
+        names = canonical_header(header, self.layout)
+        width = len(names)
+        self.columns = list(columns)
+        self.missing = [c for c in self.columns if c not in names]
+        # Every row gets blanks added at the end, which is where short
+        # rows and missing columns read from (cheaper than checking)
+        index = [names.index(c) if c in names else width for c in self.columns]
+        self._pad = [""] * (width + 1)
+        if len(index) == 1:
+            only = itemgetter(index[0])
+            self._get = lambda row: (only(row),)
+        else:
+            self._get = itemgetter(*index)
+
+    def __call__(self, row):
+        return self._get(row + self._pad)
+
+    def rows(self, reader):
+        return map(self._get, map(add, filter(None, reader), repeat(self._pad)))
+
+
+class CompleteLines:
+    """Decoded lines from a binary file, stopping before an unfinished last line.
+
+    offset is the byte position just after the last line handed out.
+    """
+
+    def __init__(self, f, offset):
+        self.f = f
+        self.offset = offset
+
+    def __iter__(self):
+        self.f.seek(self.offset)
+        for raw in self.f:
+            if not raw.endswith(b"\n"):
+                return
+            self.offset += len(raw)
+            yield raw.decode("utf-8")
+
+
+FINGERPRINT_BYTES = 4096
+
+
+def fingerprint(f, offset):
+    """Hashes of the start of a binary file and of the bytes just before offset.
+
+    If either changes, the file was rewritten rather than appended to.
+    """
+    f.seek(0)
+    head = f.read(min(offset, FINGERPRINT_BYTES))
+    start = max(0, offset - FINGERPRINT_BYTES)
+    f.seek(start)
+    tail = f.read(offset - start)
+    return [hashlib.sha1(head).hexdigest(), hashlib.sha1(tail).hexdigest()]
+
+
+def _open_csv(path):
+    if path == "-":
+        return sys.stdin
+    return Path(path).open(newline="", encoding="utf-8")
+
+
+def read_columns(paths, columns, warn: bool = True):
+    """Tuples of the given canonical columns from every row of each CSV in turn.
+
+    "-" reads from stdin. Each file is read with its own header and
+    layout, so files from different writers can be combined. With warn,
+    columns a file does not have are reported on stderr.
+    """
+    for path in paths:
+        f = _open_csv(path)
+        try:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                continue
+            extractor = Extractor(header, columns)
+            if warn and extractor.missing:
+                print(f"{'stdin' if path == '-' else path} ({extractor.layout} layout): "
+                      f"no {', '.join(extractor.missing)}; read as blank", file=sys.stderr)
+            yield from extractor.rows(reader)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Show the layout of metrics CSV files.")
+    ap.add_argument("files", nargs="+")
+    args = ap.parse_args()
+    for path in args.files:
+        with Path(path).open(newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        layout = detect_layout(header)
+        renamed = [f"{a}->{b}" for a, b in zip(header, canonical_header(header, layout)) if a != b]
+        print(f"{path}: {layout}" + (f" ({', '.join(renamed)})" if renamed else ""))
+
+
+if __name__ == "__main__":
+    main()
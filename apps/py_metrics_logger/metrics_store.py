@@ -0,0 +1,346 @@
+"""
+Append-only binary copy of the metrics CSV.
+
+Every session is one fixed-width record, so the file can be memory-mapped
+and each numeric column read as a strided view without building a dict
+or even a tuple per row.
+
+A store imported from one CSV remembers how far into that CSV it has read
+and a fingerprint of it (as summarize_metrics does for its cache), so
+sync_csv can add only the rows appended since, or re-import the CSV if it
+was rewritten.
+
+Usage:
+  python metrics_store.py import                 # baseline_vs_week1.csv -> .bin
+  python metrics_store.py import a.csv b.csv --out all.bin
+  python metrics_store.py sync [CSV] [--store FILE]
+  python metrics_store.py summary [--store FILE]
+"""
+import argparse
+import csv
+import hashlib
+import mmap
+import os
+import struct
+from operator import sub
+from pathlib import Path
+
+import metrics_schema
+
+ROOT = Path(__file__).resolve().parents[2]
+METRICS_CSV = ROOT / "metrics" / "baseline_vs_week1.csv"
+STORE_PATH = METRICS_CSV.with_suffix(".bin")
+
+MAGIC = b"SAHAYAM\x00"
+VERSION = 2
+
+# One unsigned byte per value, in this order at the start of each record
+NUMERIC_COLUMNS = [
+    "mfa_before", "mfa_after", "screen_lock_before", "screen_lock_after",
+    "bank_limit_before", "bank_limit_after", "scam_quiz_score_before", "scam_quiz_score_after",
+    "used_public_wifi", "has_home_wifi_issues", "scanned_unknown_qr", "used_public_qr_for_payment",
+    "installed_unknown_apps", "os_out_of_date", "inserted_unknown_usb", "used_public_usb_charger",
+    "shares_device_without_lock", "password_reuse", "has_password_manager", "fell_for_social_link_or_call",
+    "risk_score_before", "risk_score_after",
+]
+CATEGORY_COLUMNS = ["risk_category_before", "risk_category_after"]
+CATEGORIES = ["low", "medium", "high"]
+UNKNOWN_CATEGORY = 255
+
+# Fixed-width UTF-8 text, padded with zero bytes (longer values are cut)
+TEXT_COLUMNS = [
+    ("session_id", 24),
+    ("participant_code", 8),
+    ("participant_type", 20),
+    ("age_group", 8),
+    ("language", 8),
+    ("date", 10),
+]
+
+RECORD = struct.Struct(
+    "<"
+    + "B" * (len(NUMERIC_COLUMNS) + len(CATEGORY_COLUMNS))
+    + "".join(f"{width}s" for _, width in TEXT_COLUMNS)
+)
+# magic, version, record size, then the source CSV: bytes read, records
+# made from them, hash of its path and its metrics_schema.fingerprint
+# (all empty for stores built from several CSVs or appended to directly)
+FILE_HEADER = struct.Struct("<8sIIQQ40s40s40s")
+NO_SOURCE = (0, 0, b"", b"", b"")
+
+# CSV columns behind a record, in record order
+STORE_COLUMNS = NUMERIC_COLUMNS + CATEGORY_COLUMNS + [name for name, _ in TEXT_COLUMNS]
+
+# Byte offset of each column inside a record
+OFFSETS = {name: i for i, name in enumerate(NUMERIC_COLUMNS + CATEGORY_COLUMNS)}
+_pos = len(OFFSETS)
+for _name, _width in TEXT_COLUMNS:
+    OFFSETS[_name] = _pos
+    _pos += _width
+
+
+def _byte(value) -> int:
+    try:
+        return max(0, min(255, int(value)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _text(value, width: int) -> bytes:
+    raw = str(value or "").encode("utf-8")[:width]
+    # Do not leave half of a multi-byte character at the end
+    return raw.decode("utf-8", errors="ignore").encode("utf-8")
+
+
+# Plain numbers as the CSV has them, so most values skip _byte
+_BYTE_VALUES = {str(i): i for i in range(256)}
+_CATEGORY_CODES = {cat: i for i, cat in enumerate(CATEGORIES)}
+_FIRST_CATEGORY = len(NUMERIC_COLUMNS)
+_FIRST_TEXT = _FIRST_CATEGORY + len(CATEGORY_COLUMNS)
+
+
+def pack_values(values) -> bytes:
+    """One fixed-width record from the values of STORE_COLUMNS, in that order."""
+    numbers = values[:_FIRST_CATEGORY]
+    packed = list(map(_BYTE_VALUES.get, numbers))
+    if None in packed:
+        packed = [_byte(v) for v in numbers]
+    for cat in values[_FIRST_CATEGORY:_FIRST_TEXT]:
+        packed.append(_CATEGORY_CODES.get(str(cat or "").strip().lower(), UNKNOWN_CATEGORY))
+    packed.extend(_text(v, width) for v, (_, width) in zip(values[_FIRST_TEXT:], TEXT_COLUMNS))
+    return RECORD.pack(*packed)
+
+
+def pack_row(row: dict) -> bytes:
+    """One fixed-width record from a metrics CSV row keyed by column name."""
+    return pack_values([row.get(name) for name in STORE_COLUMNS])
+
+
+def _pack_header(source=NO_SOURCE) -> bytes:
+    return FILE_HEADER.pack(MAGIC, VERSION, RECORD.size, *source)
+
+
+def _open_for_append(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = path.open("ab")
+    if f.tell() == 0:
+        f.write(_pack_header())
+    return f
+
+
+def append_rows(rows, path: Path = STORE_PATH) -> int:
+    """Append metrics rows (dicts keyed by CSV column) to the store."""
+    return append_values(([row.get(name) for name in STORE_COLUMNS] for row in rows), path)
+
+
+def append_values(rows, path: Path = STORE_PATH) -> int:
+    """Append rows given as STORE_COLUMNS value tuples to the store."""
+    count = 0
+    with _open_for_append(path) as f:
+        for record in map(pack_values, rows):
+            f.write(record)
+            count += 1
+    return count
+
+
+class MetricsStore:
+    """Read-only, memory-mapped view of a metrics store file."""
+
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        size = self.path.stat().st_size
+        if size < FILE_HEADER.size:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a metrics store")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, *source = FILE_HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{self.path} has an unknown layout")
+        # (bytes read, records, path hash, head hash, tail hash) of the source CSV
+        self.source = tuple(v.rstrip(b"\x00") if isinstance(v, bytes) else v for v in source)
+        self._view = memoryview(self._map)[FILE_HEADER.size:]
+        # A record cut short by a crash during append is ignored
+        self.count = len(self._view) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def imported_from(self, csv_path: Path) -> bool:
+        """True if the store was imported from this CSV (and only from it)."""
+        return self.source[2] == _path_hash(csv_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        view = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+            self._view = None
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def column(self, name: str) -> memoryview:
+        """Strided view over one numeric or category column (no copy)."""
+        if name not in NUMERIC_COLUMNS and name not in CATEGORY_COLUMNS:
+            raise KeyError(name)
+        start = OFFSETS[name]
+        end = self.count * RECORD.size
+        return self._view[start:end:RECORD.size]
+
+    def text_column(self, name: str):
+        """Decoded values of one text column, one at a time."""
+        width = dict(TEXT_COLUMNS)[name]
+        start = OFFSETS[name]
+        for i in range(self.count):
+            pos = i * RECORD.size + start
+            yield bytes(self._view[pos:pos + width]).rstrip(b"\x00").decode("utf-8")
+
+    def records(self):
+        """Raw record tuples in file order (text fields stay as bytes)."""
+        return RECORD.iter_unpack(self._view[: self.count * RECORD.size])
+
+
+def adoption_summary(store: MetricsStore) -> dict:
+    """The summarize_metrics numbers, computed from whole columns."""
+    total = len(store)
+    if not total:
+        return {"total": 0}
+
+    def adopted(prefix: str) -> int:
+        gains = map(sub, store.column(prefix + "_after"), store.column(prefix + "_before"))
+        return sum(map((1).__eq__, gains))
+
+    scam_gain = sum(store.column("scam_quiz_score_after")) - sum(store.column("scam_quiz_score_before"))
+    return {
+        "total": total,
+        "mfa_pct": 100.0 * adopted("mfa") / total,
+        "screen_pct": 100.0 * adopted("screen_lock") / total,
+        "bank_pct": 100.0 * adopted("bank_limit") / total,
+        "scam_mean": scam_gain / total,
+    }
+
+
+def _path_hash(path: Path) -> bytes:
+    return hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest().encode("ascii")
+
+
+def _append_from_csv(csv_path: Path, out: Path, source) -> int:
+    """Append the complete CSV lines after source's offset and record the
+    new offset and fingerprint in the header; returns rows added."""
+    offset, records, path_hash = source[:3]
+    with csv_path.open("rb") as f:
+        header = next(csv.reader(iter(metrics_schema.CompleteLines(f, 0))), None)
+        if header is None:
+            return 0
+        lines = metrics_schema.CompleteLines(f, offset)
+        rows = csv.reader(iter(lines))
+        if offset == 0:
+            next(rows)  # the header line
+        extractor = metrics_schema.Extractor(header, STORE_COLUMNS)
+        added = append_values(extractor.rows(rows), out)
+        head, tail = metrics_schema.fingerprint(f, lines.offset)
+    new_source = (lines.offset, records + added, path_hash, head.encode("ascii"), tail.encode("ascii"))
+    with out.open("r+b") as f:
+        f.write(_pack_header(new_source))
+    return added
+
+
+def sync_csv(csv_path: Path = METRICS_CSV, out: Path = STORE_PATH) -> int:
+    """Bring a store imported from csv_path up to date; returns rows added.
+
+    Rows appended to the CSV since the last import or sync are added to
+    the store. If the CSV was rewritten, the store is for another CSV or
+    has rows it did not get from the CSV, everything is imported again.
+    A last line without a newline may still be being written, so it is
+    left for the next sync.
+    """
+    csv_path = Path(csv_path)
+    out = Path(out)
+    try:
+        with MetricsStore(out) as store:
+            source, count = store.source, len(store)
+    except (OSError, ValueError):
+        source = None
+    path_hash = _path_hash(csv_path)
+    if source and source[2] == path_hash and source[1] == count:
+        with csv_path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            offset = source[0]
+            if offset <= size and [h.decode("ascii") for h in source[3:]] == metrics_schema.fingerprint(f, offset):
+                if offset == size:
+                    return 0
+                return _append_from_csv(csv_path, out, source)
+    if out.exists():
+        out.unlink()
+    with _open_for_append(out):
+        pass
+    return _append_from_csv(csv_path, out, (0, 0, path_hash))
+
+
+def import_csv(paths, out: Path, append: bool = False) -> int:
+    """Convert metrics CSV files of any layout into a store, replacing it unless append is set.
+
+    A store made from a single CSV remembers it, so sync_csv can keep it
+    up to date.
+    """
+    paths = [str(p) for p in paths]
+    if len(paths) == 1 and not append and paths[0] != "-":
+        if out.exists():
+            out.unlink()
+        return sync_csv(Path(paths[0]), out)
+    if not append and out.exists():
+        out.unlink()
+    count = append_values(metrics_schema.read_columns(paths, STORE_COLUMNS), out)
+    # Not tied to one CSV any more
+    with out.open("r+b") as f:
+        f.write(_pack_header())
+    return count
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Binary metrics store for SAHAYAM.")
+    sub_cmds = ap.add_subparsers(dest="command", required=True)
+
+    imp = sub_cmds.add_parser("import", help="convert metrics CSV files into a store")
+    imp.add_argument("csv", nargs="*", default=[str(METRICS_CSV)])
+    imp.add_argument("--out", default=str(STORE_PATH))
+    imp.add_argument("--append", action="store_true", help="add to an existing store")
+
+    syn = sub_cmds.add_parser("sync", help="add rows appended to a CSV since its import")
+    syn.add_argument("csv", nargs="?", default=str(METRICS_CSV))
+    syn.add_argument("--store", default=str(STORE_PATH))
+
+    summ = sub_cmds.add_parser("summary", help="print adoption numbers from a store")
+    summ.add_argument("--store", default=str(STORE_PATH))
+
+    args = ap.parse_args()
+
+    if args.command == "import":
+        count = import_csv(args.csv, Path(args.out), append=args.append)
+        print(f"Imported {count} rows into {args.out}")
+        return
+    if args.command == "sync":
+        count = sync_csv(Path(args.csv), Path(args.store))
+        print(f"Added {count} rows to {args.store}")
+        return
+
+    with MetricsStore(Path(args.store)) as store:
+        s = adoption_summary(store)
+    print("Total participants logged:", s["total"])
+    if s["total"]:
+        print(f"MFA adoption (0->1): {s['mfa_pct']:.1f}% of participants")
+        print(f"Screen lock adoption (0->1): {s['screen_pct']:.1f}% of participants")
+        print(f"Bank limit adoption (0->1): {s['bank_pct']:.1f}% of participants")
+        print(f"Average scam-score improvement (out of 5): {s['scam_mean']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
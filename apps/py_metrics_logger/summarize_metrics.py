@@ -1,64 +1,240 @@
+import argparse
 import csv
+import json
+import os
+from collections import Counter
 from pathlib import Path
-from statistics import mean
+
+import metrics_schema
+import metrics_store
 
 METRICS_PATH = Path(__file__).resolve().parents[2] / "metrics" / "baseline_vs_week1.csv"
 
-def load_rows():
-    if not METRICS_PATH.exists():
-        print("No metrics file found at", METRICS_PATH)
-        return []
-    with METRICS_PATH.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        return list(reader)
+# Columns SummaryStats reads, in this order (canonical names, see metrics_schema)
+SUMMARY_COLUMNS = (
+    "mfa_before", "mfa_after",
+    "screen_lock_before", "screen_lock_after",
+    "bank_limit_before", "bank_limit_after",
+    "scam_quiz_score_before", "scam_quiz_score_after",
+)
+
+def iter_rows(paths):
+    """Yield SUMMARY_COLUMNS tuples from each CSV file in turn; "-" reads from stdin.
 
-def to_int(row, key):
+    Every file is read with its own header and layout, so exports from
+    several clinic sites, and from log_session.py, can be combined in one run.
+    """
+    return metrics_schema.read_columns(paths, SUMMARY_COLUMNS)
+
+def to_int(value):
     try:
-        return int(row[key])
-    except Exception:
+        return int(value)
+    except (TypeError, ValueError):
         return 0
 
-def main():
-    print("=== SAHAYAM metrics summary ===")
-    print("File:", METRICS_PATH)
-    rows = load_rows()
-    if not rows:
+class SummaryStats:
+    """Running totals for the summary, updated one row at a time."""
+
+    def __init__(self):
+        self.total = 0
+        self.mfa_adopted = 0
+        self.screen_adopted = 0
+        self.bank_adopted = 0
+        self.scam_gain = 0
+
+    def add(self, values, count=1):
+        """Add count rows with these SUMMARY_COLUMNS values."""
+        mfa_b, mfa_a, screen_b, screen_a, bank_b, bank_a, scam_b, scam_a = map(to_int, values)
+        self.total += count
+        # how many went from 0 -> 1
+        if mfa_a - mfa_b == 1:
+            self.mfa_adopted += count
+        if screen_a - screen_b == 1:
+            self.screen_adopted += count
+        if bank_a - bank_b == 1:
+            self.bank_adopted += count
+        self.scam_gain += count * (scam_a - scam_b)
+
+    def add_all(self, rows):
+        # Only a few hundred distinct value tuples exist, so count them first
+        for values, count in Counter(rows).items():
+            self.add(values, count)
+        return self
+
+    def merge(self, other):
+        self.total += other.total
+        self.mfa_adopted += other.mfa_adopted
+        self.screen_adopted += other.screen_adopted
+        self.bank_adopted += other.bank_adopted
+        self.scam_gain += other.scam_gain
+        return self
+
+    def state(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        for key in vars(stats):
+            setattr(stats, key, int(state[key]))
+        return stats
+
+    def as_dict(self):
+        """Same keys as metrics_store.adoption_summary."""
+        if not self.total:
+            return {"total": 0}
+        return {
+            "total": self.total,
+            "mfa_pct": 100.0 * self.mfa_adopted / self.total,
+            "screen_pct": 100.0 * self.screen_adopted / self.total,
+            "bank_pct": 100.0 * self.bank_adopted / self.total,
+            "scam_mean": self.scam_gain / self.total,
+        }
+
+# Caches already loaded in this process (the dashboard calls main repeatedly)
+_loaded_caches = {}
+# Bumped when cached totals from older versions must not be reused
+CACHE_VERSION = 2
+
+def cache_path_for(path: Path) -> Path:
+    return path.with_name(f".{path.stem}.summary.json")
+
+def cached_stats(path: Path, cache_path: Path = None):
+    """SummaryStats for one CSV, parsing only rows appended since the last run.
+
+    The running totals are saved with the byte offset reached and a
+    fingerprint of the file. If the fingerprint no longer matches (for
+    example generate_synthetic_metrics rewrote the file), everything is
+    recomputed from the start.
+    """
+    cache_path = cache_path or cache_path_for(path)
+    cache = _loaded_caches.get(cache_path)
+    if cache is None:
+        try:
+            cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cache = None
+
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if (
+            cache
+            and cache.get("version") == CACHE_VERSION
+            and cache.get("path") == str(path.resolve())
+            and cache.get("offset", size + 1) <= size
+            and cache.get("fingerprint") == metrics_schema.fingerprint(f, cache["offset"])
+        ):
+            stats = SummaryStats.from_state(cache["stats"])
+            header = cache["header"]
+            lines = metrics_schema.CompleteLines(f, cache["offset"])
+        else:
+            stats = SummaryStats()
+            lines = metrics_schema.CompleteLines(f, 0)
+            header = next(csv.reader(iter(lines)), None)
+            if header is None:
+                return stats
+
+        if lines.offset == size:
+            return stats
+        extractor = metrics_schema.Extractor(header, SUMMARY_COLUMNS)
+        stats.add_all(extractor.rows(csv.reader(iter(lines))))
+        fingerprint = metrics_schema.fingerprint(f, lines.offset)
+
+        # A last line without a newline counts now but is not cached,
+        # since it may still be in the middle of being written
+        f.seek(lines.offset)
+        unfinished = f.read().decode("utf-8", errors="replace")
+
+    new_cache = {
+        "version": CACHE_VERSION,
+        "path": str(path.resolve()),
+        "offset": lines.offset,
+        "fingerprint": fingerprint,
+        "header": header,
+        "stats": stats.state(),
+    }
+    _loaded_caches[cache_path] = new_cache
+    try:
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        tmp.write_text(json.dumps(new_cache), encoding="utf-8")
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # read-only folder: still correct, just not faster next time
+
+    if unfinished.strip():
+        stats = SummaryStats.from_state(stats.state())
+        stats.add_all(extractor.rows(csv.reader(unfinished.splitlines())))
+    return stats
+
+def print_summary(s):
+    if not s["total"]:
         print("No data yet.")
         return
+    print("Total participants logged:", s["total"])
+    print(f"MFA adoption (0->1): {s['mfa_pct']:.1f}% of participants")
+    print(f"Screen lock adoption (0->1): {s['screen_pct']:.1f}% of participants")
+    print(f"Bank limit adoption (0->1): {s['bank_pct']:.1f}% of participants")
+    print(f"Average scam-score improvement (out of 5): {s['scam_mean']:.2f}")
 
-    total = len(rows)
-    print("Total participants logged:", total)
-
-    mfa_gain = []
-    screen_gain = []
-    bank_gain = []
-    scam_gain = []
-
-    for r in rows:
-        mfa_before = to_int(r, "mfa_before")
-        mfa_after = to_int(r, "mfa_after")
-        screen_before = to_int(r, "screenlock_before")
-        screen_after = to_int(r, "screenlock_after")
-        bank_before = to_int(r, "banklimit_before")
-        bank_after = to_int(r, "banklimit_after")
-        scam_before = to_int(r, "scam_score_before")
-        scam_after = to_int(r, "scam_score_after")
-
-        mfa_gain.append(mfa_after - mfa_before)
-        screen_gain.append(screen_after - screen_before)
-        bank_gain.append(bank_after - bank_before)
-        scam_gain.append(scam_after - scam_before)
-
-    def pct_enabled(gains):
-        # how many went from 0 -> 1
-        improved = sum(1 for g in gains if g == 1)
-        return 100.0 * improved / total
+def summarize_store(path: Path):
+    """Print the summary from the binary metrics store.
 
-    print(f"MFA adoption (0->1): {pct_enabled(mfa_gain):.1f}% of participants")
-    print(f"Screen lock adoption (0->1): {pct_enabled(screen_gain):.1f}% of participants")
-    print(f"Bank limit adoption (0->1): {pct_enabled(bank_gain):.1f}% of participants")
+    The store is first brought up to date with the metrics CSV (built on
+    first use, rows added by log_session.py appended, rebuilt if the CSV
+    was rewritten). A store built from other CSVs is read as it is.
+    """
+    if METRICS_PATH.exists():
+        tied = not path.exists()
+        if not tied:
+            try:
+                with metrics_store.MetricsStore(path) as store:
+                    tied = store.imported_from(METRICS_PATH)
+            except ValueError:
+                tied = True  # older layout: rebuild
+        if tied:
+            metrics_store.sync_csv(METRICS_PATH, path)
+    elif not path.exists():
+        print("No metrics file found at", METRICS_PATH)
+        return
+    print("File:", path)
+    with metrics_store.MetricsStore(path) as store:
+        print_summary(metrics_store.adoption_summary(store))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarize SAHAYAM metrics.")
+    ap.add_argument("files", nargs="*",
+                    help="metrics CSV files to combine, or - for stdin (default: baseline_vs_week1.csv)")
+    ap.add_argument("--store", nargs="?", const=str(metrics_store.STORE_PATH),
+                    help="read the binary metrics store instead of the CSV")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="re-read every row instead of only rows added since the last run")
+    args = ap.parse_args(argv)
+
+    print("=== SAHAYAM metrics summary ===")
+    if args.store:
+        summarize_store(Path(args.store))
+        return
+
+    files = args.files or [str(METRICS_PATH)]
+    missing = [p for p in files if p != "-" and not Path(p).exists()]
+    for p in missing:
+        print("No metrics file found at", p)
+    files = [p for p in files if p not in missing]
+    if not files:
+        print("No data yet.")
+        return
+    print("File:", ", ".join("stdin" if p == "-" else p for p in files))
 
-    print(f"Average scam-score improvement (out of 5): {mean(scam_gain):.2f}")
+    if args.no_cache:
+        stats = SummaryStats().add_all(iter_rows(files))
+    else:
+        stats = SummaryStats()
+        for p in files:
+            if p == "-":
+                stats.add_all(iter_rows(["-"]))
+            else:
+                stats.merge(cached_stats(Path(p)))
+    print_summary(stats.as_dict())
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,15 @@
+import argparse
+import csv
+import json
 import math
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+
+import pattern_index
 
 def estimate_bits(length, charset_size):
     if length <= 0 or charset_size <= 1:
@@ -35,27 +46,280 @@ def explain_pattern(pattern_type, length):
     bits = estimate_bits(length, charset)
     return bits, note
 
-def main():
-    print("Password pattern checker")
-    print("Do not type real passwords.")
-    print("Describe the pattern instead.")
-    print("Examples: only_digits, lowercase, lowercase_digits, mixed_with_symbol\n")
+# Mask letters: L upper case, l lower case, d digit, s symbol, ? any printable
+MASK_CHARSETS = {"L": 26, "l": 26, "d": 10, "s": 33, "?": 95}
+MASK_RE = re.compile(r"[Llds? ]+")
+# Runs an attacker treats as one unit: letters, digits, symbols, unknowns
+MASK_RUN_RE = re.compile(r"[Ll]+|d+|s+|\?+")
+# Case variants tried for each dictionary word: word, Word, WORD
+CASE_VARIANTS = 3
+
+_index = None
+
+def get_index():
+    """The word-list index, loaded on first use."""
+    global _index
+    if _index is None:
+        _index = pattern_index.load_index()
+    return _index
+
+def is_mask(text):
+    return bool(text) and MASK_RE.fullmatch(text) is not None and text.strip() != ""
+
+def _count(n, noun):
+    return f"{n} {noun}" if n == 1 else f"{n} {noun}s"
+
+def _run_guesses(run, index):
+    """(guesses, description, is a word) for one run of the mask, taking
+    letter runs to be a known name or word where the lists have some."""
+    n = len(run)
+    kind = run[0]
+    if kind in "Ll":
+        mixed = "L" in run and "l" in run
+        brute = (52 if mixed else 26) ** n
+        standard_case = not mixed or (run[0] == "L" and "L" not in run[1:])
+        words = index.dictionary_words(n)
+        if standard_case and words and CASE_VARIANTS * words < brute:
+            return CASE_VARIANTS * words, f"a common name or word of {_count(n, 'letter')} ({words} known)", True
+        return brute, _count(n, "random letter"), False
+    if kind == "d":
+        return 10 ** n, _count(n, "digit"), False
+    if kind == "s":
+        return MASK_CHARSETS["s"] ** n, _count(n, "symbol"), False
+    return MASK_CHARSETS["?"] ** n, _count(n, "unknown character"), False
+
+def _bits(guesses):
+    return round(math.log2(guesses), 1) if guesses > 1 else 0.0
+
+def _check_mask(mask):
+    if not is_mask(mask):
+        raise ValueError(f"not a mask: {mask!r} (use L, l, d, s, ? and spaces)")
+    return mask.replace(" ", "")
+
+@lru_cache(maxsize=65536)
+def estimate_mask(mask):
+    """Guesses, bits and a note for a password described by a mask.
+
+    The estimate is brute force over every character class the mask
+    uses: the mask cannot tell whether the letters are a real word, so
+    word lists only show up in word_list_estimate. The note also says how
+    many well-known passwords have exactly this shape.
+    """
+    flat = _check_mask(mask)
+    if "?" in flat:
+        charset = MASK_CHARSETS["?"]
+    else:
+        charset = sum(MASK_CHARSETS[c] for c in set(flat))
+    guesses = charset ** len(flat)
+    note = f"brute force over {charset} characters"
+    count, rank = get_index().common_shape(flat) if "?" not in flat else (0, 0)
+    if count:
+        note += (f"; {count} well-known passwords have this exact shape "
+                 f"(the most common is number {rank} on the list), avoid those")
+    return guesses, _bits(guesses), note
+
+@lru_cache(maxsize=65536)
+def word_list_estimate(mask):
+    """(guesses, bits, description) if the letter parts of the mask are
+    common names or words from the bundled lists, or None when that would
+    not make it any easier to guess than estimate_mask says.
+
+    This is a "what if", not the estimate: a random 8 letters have the
+    same mask as a name.
+    """
+    flat = _check_mask(mask)
+    guesses = 1
+    parts = []
+    has_word = False
+    for run in MASK_RUN_RE.findall(flat):
+        run_guesses, description, is_word = _run_guesses(run, get_index())
+        guesses *= run_guesses
+        parts.append(description)
+        has_word = has_word or is_word
+    if not has_word or guesses >= estimate_mask(mask)[0]:
+        return None
+    return guesses, _bits(guesses), " + ".join(parts)
+
+def explain_mask(mask):
+    """Like explain_pattern, for a mask such as "Llll dddd"."""
+    _, bits, note = estimate_mask(mask)
+    return bits, note
 
-    ptype = input("Pattern type: ").strip()
+LABELS = ["very weak", "weak", "okay for low risk accounts", "good for many accounts", "strong"]
+
+def _record_strength(memo, pattern_type, length, mask):
+    """(label, bits) for one survey record, memoized on its descriptor."""
+    key = (pattern_type, length, mask)
+    found = memo.get(key)
+    if found is None:
+        if mask:
+            bits = explain_mask(mask)[0]
+        else:
+            bits = explain_pattern(pattern_type, int(length))[0]
+        found = memo[key] = (classify(bits), bits)
+    return found
+
+def _field(r, key):
+    value = r.get(key)
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # a length of 8.0 reads as "8"
+    return str(value)
+
+def _json_record(line):
     try:
-        length = int(input("Approximate length (number of characters): ").strip())
+        r = json.loads(line)
     except ValueError:
-        print("Length must be a number.")
-        return
+        return None
+    if not isinstance(r, dict):
+        return None
+    return (_field(r, "participant_type") or "unknown", _field(r, "pattern_type"),
+            _field(r, "length"), _field(r, "mask"))
+
+def iter_survey_records(paths):
+    """(participant_type, pattern_type, length, mask) from CSV or JSONL files.
+
+    A file is read as JSONL if its name ends in .jsonl or .ndjson, or if
+    its first character is "{"; otherwise as CSV with a header row. "-"
+    reads from stdin. A JSONL line that is not a JSON object gives None,
+    which survey_histograms counts as skipped.
+    """
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            first = f.readline()
+            if not first:
+                continue
+            if path.endswith((".jsonl", ".ndjson")) or first.lstrip().startswith("{"):
+                for line in chain((first,), f):
+                    if line.strip():
+                        yield _json_record(line)
+                continue
+            header = next(csv.reader([first]))
+            cols = [header.index(c) if c in header else None
+                    for c in ("participant_type", "pattern_type", "length", "mask")]
+            if cols[3] is None and (cols[1] is None or cols[2] is None):
+                raise ValueError(f"{path}: needs a mask column or pattern_type and length columns")
+            for row in csv.reader(f):
+                yield tuple(
+                    (row[c] if c is not None and c < len(row) else "") for c in cols
+                )
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def survey_histograms(records):
+    """Strength label counts per participant_type, plus totals.
+
+    Returns (histograms, bit totals, records used, records skipped).
+    """
+    memo = {}
+    histograms = {}
+    bit_totals = Counter()
+    used = skipped = 0
+    for record in records:
+        if record is None:
+            skipped += 1
+            continue
+        participant_type, pattern_type, length, mask = record
+        participant_type = participant_type or "unknown"
+        try:
+            label, bits = _record_strength(memo, pattern_type, length, mask.strip())
+        except ValueError:
+            skipped += 1
+            continue
+        counts = histograms.get(participant_type)
+        if counts is None:
+            counts = histograms[participant_type] = Counter()
+        counts[label] += 1
+        bit_totals[participant_type] += bits
+        used += 1
+    return histograms, bit_totals, used, skipped
+
+def print_histograms(histograms, bit_totals):
+    width = 30
+    for participant_type in sorted(histograms):
+        counts = histograms[participant_type]
+        total = sum(counts.values())
+        print(f"\n{participant_type}: {total} records, average {bit_totals[participant_type] / total:.1f} bits")
+        for label in LABELS:
+            n = counts.get(label, 0)
+            bar = "#" * round(width * n / total)
+            print(f"  {label:<27} {n:>8} {100 * n / total:5.1f}%  {bar}")
+
+def run_batch(paths, json_out=None):
+    t0 = time.perf_counter()
+    try:
+        histograms, bit_totals, used, skipped = survey_histograms(iter_survey_records(paths))
+    except (OSError, ValueError) as e:
+        print("Cannot read survey:", e)
+        return 1
+    elapsed = time.perf_counter() - t0
+
+    print("=== Password habit survey ===")
+    if not used:
+        print("No usable records.")
+    print_histograms(histograms, bit_totals)
+    rate = f", {used / elapsed:,.0f} records/s" if elapsed > 0 else ""
+    print(f"\n{used} records, {skipped} skipped, in {elapsed:.2f} s{rate}")
+    if json_out:
+        result = {
+            ptype: {
+                "records": sum(counts.values()),
+                "average_bits": bit_totals[ptype] / sum(counts.values()),
+                "labels": {label: counts.get(label, 0) for label in LABELS},
+            }
+            for ptype, counts in sorted(histograms.items())
+        }
+        with open(json_out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print("Histograms written to", json_out)
+    return 0
 
-    bits, note = explain_pattern(ptype, length)
+def run_interactive():
+    print("Password pattern checker")
+    print("Do not type real passwords.")
+    print("Describe the pattern instead.")
+    print("Examples: only_digits, lowercase, lowercase_digits, mixed_with_symbol")
+    print("Or a mask: L capital, l small letter, d digit, s symbol, e.g. Llll dddd\n")
+
+    ptype = input("Pattern type or mask: ").strip()
+    if_word = None
+    if is_mask(ptype):
+        bits, note = explain_mask(ptype)
+        if_word = word_list_estimate(ptype)
+    else:
+        try:
+            length = int(input("Approximate length (number of characters): ").strip())
+        except ValueError:
+            print("Length must be a number.")
+            return
+        bits, note = explain_pattern(ptype, length)
     label = classify(bits)
 
     print("\nApproximate strength")
     print(f"- Estimated entropy: {bits} bits")
     print(f"- Category         : {label}")
     print(f"- Note             : {note}")
+    if if_word:
+        _, word_bits, parts = if_word
+        print(f"- If it is a word  : as {parts}, only about {word_bits} bits ({classify(word_bits)})")
     print("Remember that reuse on many sites reduces real safety a lot.")
 
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Explain password pattern strength. Without files, asks interactively."
+    )
+    ap.add_argument("files", nargs="*",
+                    help="survey CSV/JSONL files (participant_type, pattern_type, length or mask); - for stdin")
+    ap.add_argument("--json", help="also write the histograms to this JSON file")
+    args = ap.parse_args(argv)
+
+    if not args.files:
+        run_interactive()
+        return 0
+    return run_batch(args.files, args.json)
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
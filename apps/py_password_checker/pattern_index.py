@@ -0,0 +1,238 @@
+"""
+Compact index of password word lists, keyed by shape instead of by word.
+
+The checker never sees real passwords, only masks such as "Llll dddd"
+(L upper case letter, l lower case letter, d digit, s symbol, ? anything;
+spaces only separate parts). So the lists are reduced to counts:
+
+- common passwords: shape ("Lllldddd") -> how many list entries have it
+  and the rank of the most common one;
+- names and words: length -> how many entries have it.
+
+The index is a binary file of sorted 64-bit shape keys that is memory
+mapped, so loading it takes about a millisecond even for lists with
+millions of lines. It lives in the user's cache folder (not in the
+checkout) and is rebuilt automatically when a list changes; if it cannot
+be written there, it is built in memory instead.
+
+Usage:
+  python pattern_index.py build [--common FILE] [--names FILE] [--words FILE]
+  python pattern_index.py show
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+LISTS_DIR = HERE / "wordlists"
+DEFAULT_LISTS = {
+    "common": LISTS_DIR / "common_passwords.txt",
+    "names": LISTS_DIR / "indian_names.txt",
+    "words": LISTS_DIR / "common_words.txt",
+}
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "sahayam"
+INDEX_PATH = CACHE_DIR / "pattern_index.bin"
+
+MAGIC = b"SAHPAT1\x00"
+# magic, byte order (0 little, 1 big), shapes, common passwords, sources JSON size
+HEADER = struct.Struct("<8sBQQI")
+MAX_WORD_LENGTH = 64
+# A shape is packed into 64 bits: 2 bits per character, then 6 bits of length
+MAX_SHAPE_LENGTH = 29
+SHAPE_CODES = {"L": 0, "l": 1, "d": 2, "s": 3}
+
+
+def char_class(ch: str) -> str:
+    if ch.isdigit():
+        return "d"
+    if ch.isalpha():
+        return "L" if ch.isupper() else "l"
+    return "s"
+
+
+def shape(password: str) -> str:
+    """"India@123" -> "Lllllsddd"."""
+    return "".join(map(char_class, password))
+
+
+def shape_key(shape_text: str) -> int:
+    """64-bit key for a shape, or -1 if it is too long to index."""
+    if len(shape_text) > MAX_SHAPE_LENGTH:
+        return -1
+    key = 0
+    for ch in shape_text:
+        key = key << 2 | SHAPE_CODES[ch]
+    return key << 6 | len(shape_text)
+
+
+def read_list(path: Path):
+    """Entries of a list file in order, skipping blank lines and # comments."""
+    with path.open(encoding="utf-8", errors="replace") as f:
+        for line in f:
+            entry = line.rstrip("\r\n")
+            if entry and not entry.startswith("#"):
+                yield entry
+
+
+def _fingerprint(lists: dict) -> dict:
+    out = {}
+    for kind, path in lists.items():
+        st = Path(path).stat()
+        out[kind] = [str(Path(path).resolve()), st.st_size, st.st_mtime_ns]
+    return out
+
+
+def _byte_order() -> int:
+    return 0 if sys.byteorder == "little" else 1
+
+
+def index_bytes(lists: dict = None) -> tuple[bytes, int, int]:
+    """(index file contents, common passwords, shapes) for lists."""
+    lists = lists or DEFAULT_LISTS
+    common = {}
+    total = 0
+    for rank, entry in enumerate(read_list(Path(lists["common"])), 1):
+        total += 1
+        key = shape_key(shape(entry))
+        if key < 0:
+            continue
+        found = common.get(key)
+        if found is None:
+            common[key] = [1, rank]
+        else:
+            found[0] += 1
+
+    by_length = {}
+    for kind in ("names", "words"):
+        counts = array("I", [0] * MAX_WORD_LENGTH)
+        for entry in set(e.lower() for e in read_list(Path(lists[kind]))):
+            if entry.isalpha() and len(entry) < MAX_WORD_LENGTH:
+                counts[len(entry)] += 1
+        by_length[kind] = counts
+
+    keys = array("Q", sorted(common))
+    counts = array("I", (common[k][0] for k in keys))
+    ranks = array("I", (min(common[k][1], 2**32 - 1) for k in keys))
+    sources = json.dumps(_fingerprint(lists)).encode("utf-8")
+    sources += b" " * (-len(sources) % 8)  # keep the arrays 8-byte aligned
+
+    parts = [HEADER.pack(MAGIC, _byte_order(), len(keys), total, len(sources)), sources]
+    parts.extend(a.tobytes() for a in (by_length["names"], by_length["words"], keys, counts, ranks))
+    return b"".join(parts), total, len(keys)
+
+
+def build_index(lists: dict = None, out: Path = INDEX_PATH) -> tuple[int, int]:
+    """Write the index for lists to out; returns (common passwords, shapes)."""
+    data, total, shapes = index_bytes(lists)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, out)
+    return total, shapes
+
+
+class PatternIndex:
+    """Read-only, memory-mapped view of an index written by build_index.
+
+    Opening only maps the file; common_shape is a binary search. With
+    data (from index_bytes), the index is read from memory instead.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH, data: bytes = None):
+        if data is not None:
+            self._map = data
+        else:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, order, n, total, sources_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or order != _byte_order():
+            raise ValueError(f"{path} is not a pattern index for this machine")
+        pos = HEADER.size
+        self.sources = json.loads(self._map[pos:pos + sources_size])
+        pos += sources_size
+        view = memoryview(self._map)
+
+        def take(fmt, count):
+            nonlocal pos
+            size = array(fmt).itemsize * count
+            part = view[pos:pos + size].cast(fmt)
+            pos += size
+            return part
+
+        self.names = take("I", MAX_WORD_LENGTH)
+        self.words = take("I", MAX_WORD_LENGTH)
+        self._keys = take("Q", n)
+        self._counts = take("I", n)
+        self._ranks = take("I", n)
+        self.shapes = n
+        self.common_total = total
+
+    def common_shape(self, mask_shape: str) -> tuple[int, int]:
+        """(count, best rank) of common passwords with this shape, or (0, 0)."""
+        key = shape_key(mask_shape)
+        i = bisect.bisect_left(self._keys, key)
+        if key < 0 or i == self.shapes or self._keys[i] != key:
+            return 0, 0
+        return self._counts[i], self._ranks[i]
+
+    def dictionary_words(self, length: int) -> int:
+        """Names and words of this many letters an attacker would try."""
+        if not 0 < length < MAX_WORD_LENGTH:
+            return 0
+        return self.names[length] + self.words[length]
+
+
+def load_index(path: Path = INDEX_PATH, lists: dict = None) -> PatternIndex:
+    """The index at path, rebuilt first if one of its lists changed.
+
+    Without lists, the index keeps whichever lists it was built from (see
+    "build --common ..."); a missing index is built from DEFAULT_LISTS.
+    If the index cannot be written (a read-only home, say), it is built in
+    memory for this run.
+    """
+    try:
+        index = PatternIndex(path)
+        wanted = lists or {kind: Path(src[0]) for kind, src in index.sources.items()}
+        if index.sources != _fingerprint(wanted):
+            index = None
+    except (OSError, ValueError, KeyError):
+        index = None
+    if index is None:
+        try:
+            build_index(lists or DEFAULT_LISTS, path)
+            index = PatternIndex(path)
+        except OSError:
+            index = PatternIndex(data=index_bytes(lists or DEFAULT_LISTS)[0])
+    return index
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or show the password pattern index.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="rebuild the index from word lists")
+    for kind, path in DEFAULT_LISTS.items():
+        build.add_argument(f"--{kind}", default=str(path), help=f"{kind} list (default: {path.name})")
+    build.add_argument("-o", "--out", default=str(INDEX_PATH))
+    sub.add_parser("show", help="print a summary of the current index")
+    args = ap.parse_args()
+
+    if args.command == "build":
+        lists = {kind: Path(getattr(args, kind)) for kind in DEFAULT_LISTS}
+        total, shapes = build_index(lists, Path(args.out))
+        print(f"Indexed {total} common passwords ({shapes} shapes) into {args.out}")
+        return
+
+    index = load_index()
+    print(f"Common passwords: {index.common_total} in {index.shapes} shapes")
+    for label, counts in (("Names", index.names), ("Words", index.words)):
+        print(f"{label} by length: " + ", ".join(f"{n}: {c}" for n, c in enumerate(counts) if c))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
+import argparse
+import hashlib
+import json
+import os
 import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 import sys
 
+import simple_pdf
+
 ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "apps" / "py_metrics_logger"))
+import metrics_schema  # noqa: E402
+
 GEN = ROOT / "materials" / "generated"
 OUT = ROOT / "materials" / "pdf"
+METRICS_CSV = ROOT / "metrics" / "baseline_vs_week1.csv"
 OUT.mkdir(parents=True, exist_ok=True)
 
+# Hash of each markdown file at its last successful conversion
+MANIFEST = ".pdf_manifest.json"
+
 def has_pandoc():
     try:
         subprocess.run(["pandoc", "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -14,26 +29,202 @@ def has_pandoc():
     except FileNotFoundError:
         return False
 
-def main():
-    if not has_pandoc():
-        print("pandoc is not installed.")
-        print("On macOS you can install it with:")
-        print("  brew install pandoc")
-        print("After that, run this script again.")
+def file_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+def is_up_to_date(md: Path, pdf: Path, manifest: dict) -> bool:
+    """True if the PDF is newer than the markdown, or the markdown was
+    rewritten with the same content it had at the last conversion."""
+    try:
+        pdf_mtime = pdf.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    if pdf_mtime >= md.stat().st_mtime:
+        return True
+    return manifest.get(md.name) == file_hash(md)
+
+def convert(md: Path, pdf: Path, backend: str = "pandoc") -> float:
+    """Convert one file with pandoc or the built-in writer; returns the seconds it took."""
+    t0 = time.perf_counter()
+    if backend == "builtin":
+        text = md.read_text(encoding="utf-8")
+        simple_pdf.markdown_to_pdf(text, pdf, title=md.stem)
+    else:
+        subprocess.run(["pandoc", str(md), "-o", str(pdf)], check=True, capture_output=True, text=True)
+    return time.perf_counter() - t0
+
+def load_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path: Path, manifest: dict):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=0, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+def report_code(md: Path) -> str:
+    """report_S001.en.md -> S001"""
+    return md.name[len("report_"):].split(".", 1)[0]
+
+INFO_COLUMNS = ("participant_code", "participant_type", "date")
+
+def participant_info(metrics_csv: Path) -> dict:
+    """participant_code -> {"participant_type", "date"} (the last row if a code repeats).
+
+    The CSV can be in any metrics_schema layout.
+    """
+    try:
+        return {
+            code: {"participant_type": p_type, "date": day}
+            for code, p_type, day in metrics_schema.read_columns([metrics_csv], INFO_COLUMNS)
+        }
+    except FileNotFoundError:
+        return {}
+
+def select_reports(reports, info, date=None, participant_type=None):
+    """Reports whose metrics row matches the filters.
+
+    date matches as a prefix, so "2026-10" selects a whole month. Reports
+    without a metrics row are kept only when no filter is given.
+    """
+    if not date and not participant_type:
+        return list(reports)
+    selected = []
+    for md in reports:
+        row = info.get(report_code(md))
+        if row is None:
+            continue
+        if date and not row.get("date", "").startswith(date):
+            continue
+        if participant_type and row.get("participant_type") != participant_type:
+            continue
+        selected.append(md)
+    return selected
+
+def contents_entry(md: Path, info: dict) -> str:
+    code = report_code(md)
+    row = info.get(code)
+    if row is None:
+        return code
+    return f"{code}  ({row.get('participant_type', '')}, {row.get('date', '')})"
+
+# Between reports in a pandoc bundle; pandoc's default LaTeX engine honours it
+PANDOC_PAGE_BREAK = "\n\n\\newpage\n\n"
+
+def write_bundle(reports, out: Path, backend: str, info: dict) -> int:
+    """All reports in one PDF with a contents list; returns the page count (0 if unknown)."""
+    if backend == "builtin":
+        documents = [(contents_entry(md, info), md.read_text(encoding="utf-8")) for md in reports]
+        return simple_pdf.bundle_to_pdf(documents, out, title=out.stem)
+    text = PANDOC_PAGE_BREAK.join(md.read_text(encoding="utf-8") for md in reports)
+    subprocess.run(
+        ["pandoc", "-f", "markdown", "-o", str(out), "--toc", "--toc-depth=1"],
+        input=text, check=True, capture_output=True, text=True,
+    )
+    return 0
+
+def bundle(args, backend, reports):
+    info = participant_info(Path(args.metrics))
+    selected = select_reports(reports, info, args.date, args.type)
+    if not selected:
+        print("No reports match the selected date / participant type.")
         return
+    out = Path(args.bundle)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        pages = write_bundle(selected, out, backend, info)
+    except subprocess.CalledProcessError as e:
+        print(f"FAILED {out.name}: {(e.stderr or '').strip()}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - t0
+    page_note = f", {pages} pages" if pages else ""
+    print(f"Bundled {len(selected)} of {len(reports)} reports into {out}{page_note} "
+          f"in {elapsed:.2f} s ({backend})")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Convert markdown clinic reports to PDF.")
+    ap.add_argument("--backend", choices=["auto", "builtin", "pandoc"], default="auto",
+                    help="pandoc for full fidelity, builtin for fast conversion without pandoc "
+                         "(default auto: pandoc if installed)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="conversions to run at once (default: number of CPUs)")
+    ap.add_argument("--force", action="store_true",
+                    help="convert every report, even if its PDF is up to date")
+    ap.add_argument("--bundle", metavar="PDF",
+                    help="write the selected reports into this one PDF with a contents page")
+    ap.add_argument("--date", help="with --bundle: only reports from this date or prefix (e.g. 2026-10)")
+    ap.add_argument("--type", help="with --bundle: only this participant_type (e.g. senior)")
+    ap.add_argument("--metrics", default=str(METRICS_CSV),
+                    help="metrics CSV used for --date/--type (default: baseline_vs_week1.csv)")
+    args = ap.parse_args(argv)
+
+    backend = args.backend
+    if backend != "builtin":
+        if has_pandoc():
+            backend = "pandoc"
+        elif backend == "pandoc":
+            print("pandoc is not installed.")
+            print("On macOS you can install it with:")
+            print("  brew install pandoc")
+            print("After that, run this script again, or use --backend builtin.")
+            return
+        else:
+            backend = "builtin"
 
     reports = sorted(GEN.glob("report_*.en.md"))
     if not reports:
         print("No markdown reports found in", GEN)
         return
 
+    if args.bundle:
+        bundle(args, backend, reports)
+        return
+
+    manifest_path = OUT / MANIFEST
+    manifest = {} if args.force else load_manifest(manifest_path)
+    todo = []
     for md in reports:
-        pdf_name = md.with_suffix(".pdf").name
-        pdf_path = OUT / pdf_name
-        print("Converting", md.name, "->", pdf_name)
-        subprocess.run(["pandoc", str(md), "-o", str(pdf_path)], check=True)
+        pdf = OUT / md.with_suffix(".pdf").name
+        if args.force or not is_up_to_date(md, pdf, manifest):
+            todo.append((md, pdf))
+    skipped = len(reports) - len(todo)
+
+    t0 = time.perf_counter()
+    busy = 0.0
+    failed = []
+    # pandoc does the work in its own process, so threads are enough for it;
+    # the built-in writer is Python code and needs worker processes
+    executor = ThreadPoolExecutor if backend == "pandoc" else ProcessPoolExecutor
+    with executor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(convert, md, pdf, backend): (md, pdf) for md, pdf in todo}
+        for future in as_completed(futures):
+            md, pdf = futures[future]
+            try:
+                seconds = future.result()
+            except subprocess.CalledProcessError as e:
+                failed.append(md.name)
+                print(f"FAILED {md.name}: {(e.stderr or '').strip()}")
+                continue
+            except (OSError, UnicodeDecodeError) as e:
+                failed.append(md.name)
+                print(f"FAILED {md.name}: {e}")
+                continue
+            busy += seconds
+            manifest[md.name] = file_hash(md)
+            print(f"Converted {md.name} -> {pdf.name} ({seconds:.2f} s)")
+    wall = time.perf_counter() - t0
 
+    if todo:
+        save_manifest(manifest_path, manifest)
+    converted = len(todo) - len(failed)
+    print(f"\n{converted} converted, {skipped} up to date, {len(failed)} failed "
+          f"in {wall:.2f} s ({busy:.2f} s of {backend} time, {args.jobs} jobs)")
     print("Done. PDFs are in", OUT)
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,318 @@
+"""
+Small PDF writer for the markdown that clinic_assistant produces.
+
+Handles only what the reports use: "#", "##" and "###" headings, "- "
+bullets, **bold** runs and plain paragraphs. Text is set in the standard
+Helvetica fonts, which every PDF viewer has built in, so no font files are
+embedded and a report renders in a few milliseconds without pandoc.
+Characters outside the Windows-1252 set are replaced ("₹" becomes "Rs.").
+"""
+import re
+import zlib
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+MARGIN = 56
+BODY_SIZE = 11
+BULLET_INDENT = 14
+
+# (font size, space above) per heading level
+HEADINGS = {1: (18, 10), 2: (14, 12), 3: (12, 8)}
+
+# Advance widths (1/1000 em) of the printable ASCII characters " " .. "~"
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+# Windows-1252 punctuation above 0x7f: ellipsis, quotes, bullet, dashes
+_EXTRA = {0x85: (1000, 1000), 0x91: (222, 278), 0x92: (222, 278), 0x93: (333, 500),
+          0x94: (333, 500), 0x95: (350, 350), 0x96: (556, 556), 0x97: (1000, 1000)}
+
+
+def _width_table(ascii_widths, column):
+    table = [556] * 256  # accented letters: close enough for line breaking
+    table[32:127] = ascii_widths
+    for code, widths in _EXTRA.items():
+        table[code] = widths[column]
+    return table
+
+
+# font resource name -> (base font, widths by byte)
+FONTS = {
+    "F1": ("Helvetica", _width_table(_HELVETICA, 0)),
+    "F2": ("Helvetica-Bold", _width_table(_HELVETICA_BOLD, 1)),
+}
+
+REPLACEMENTS = {"₹": "Rs.", "\t": "    "}
+
+
+def encode(text: str) -> bytes:
+    """Text as Windows-1252 bytes, the encoding the fonts are declared with."""
+    for old, new in REPLACEMENTS.items():
+        if old in text:
+            text = text.replace(old, new)
+    return text.encode("cp1252", errors="replace")
+
+
+def text_width(data: bytes, font: str, size: float) -> float:
+    widths = FONTS[font][1]
+    return sum(widths[b] for b in data) * size / 1000
+
+
+def _escape(data: bytes) -> bytes:
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+
+def inline_runs(text: str):
+    """[(text, bold)] for a line, splitting out **bold** parts."""
+    runs = []
+    pos = 0
+    for m in BOLD_RE.finditer(text):
+        if m.start() > pos:
+            runs.append((text[pos:m.start()], False))
+        runs.append((m.group(1), True))
+        pos = m.end()
+    if pos < len(text):
+        runs.append((text[pos:], False))
+    return runs
+
+
+def markdown_blocks(text: str):
+    """Yield (kind, text) blocks: ("h1".."h3", "bullet", "para") in order.
+
+    Consecutive plain lines are joined into one paragraph, as in markdown.
+    """
+    para = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        heading = re.match(r"(#{1,3})\s+(.*)", line)
+        if heading or line.startswith(("- ", "* ")) or not line:
+            if para:
+                yield "para", " ".join(para)
+                para = []
+        if heading:
+            yield f"h{len(heading.group(1))}", heading.group(2)
+        elif line.startswith(("- ", "* ")):
+            yield "bullet", line[2:].strip()
+        elif line:
+            para.append(line)
+    if para:
+        yield "para", " ".join(para)
+
+
+class PdfLayout:
+    """Lays out markdown onto pages, keeping each page's content stream."""
+
+    def __init__(self):
+        self.pages = []  # list of lists of content-stream lines (bytes)
+        self.ops = None
+        self.y = 0
+
+    @property
+    def page_number(self) -> int:
+        """1-based number of the page being written."""
+        return len(self.pages)
+
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _space(self, height):
+        if self.ops is None or self.y - height < MARGIN:
+            self.new_page()
+            return
+        self.y -= height
+
+    def _line(self, pieces, x, size):
+        """pieces: [(font, bytes)] drawn left to right on the current line."""
+        ops = [b"BT", b"%.2f %.2f Td" % (x, self.y)]
+        font = None
+        for piece_font, data in pieces:
+            if piece_font != font:
+                font = piece_font
+                ops.append(b"/%s %d Tf" % (font.encode(), size))
+            ops.append(b"(" + _escape(data) + b") Tj")
+        ops.append(b"ET")
+        self.ops.append(b" ".join(ops))
+
+    def text(self, runs, size=BODY_SIZE, x=MARGIN, bold=False, first_prefix=None):
+        """Word-wrap runs of (text, bold) between x and the right margin."""
+        leading = size * 1.35
+        max_width = PAGE_WIDTH - MARGIN - x
+        # (font, bytes, glued): glued words follow the previous one without
+        # a space, e.g. "**KYC**," where the comma starts a new run
+        words = []
+        spaced = True
+        for run, run_bold in runs:
+            font = "F2" if bold or run_bold else "F1"
+            for i, word in enumerate(run.split(" ")):
+                if i:
+                    spaced = True
+                if word:
+                    words.append((font, encode(word), not spaced))
+                    spaced = False
+
+        lines = [[]]
+        width = 0.0
+        space = text_width(b" ", "F1", size)
+        for font, data, glued in words:
+            w = text_width(data, font, size)
+            sep = 0 if glued or not lines[-1] else space
+            if lines[-1] and width + sep + w > max_width:
+                lines.append([])
+                width = 0.0
+                sep = 0
+            if sep:
+                lines[-1].append(("F1", b" "))
+            lines[-1].append((font, data))
+            width += sep + w
+
+        for n, pieces in enumerate(lines):
+            self._space(leading)
+            if n == 0 and first_prefix:
+                self._line([("F1", first_prefix)], x - BULLET_INDENT, size)
+            if pieces:
+                self._line(pieces, x, size)
+
+    def contents_line(self, left: str, right: str, size=BODY_SIZE):
+        """left text, then right text flush with the right margin (a contents line)."""
+        self._space(size * 1.5)
+        left_data, right_data = encode(left), encode(right)
+        self._line([("F1", left_data)], MARGIN, size)
+        x = PAGE_WIDTH - MARGIN - text_width(right_data, "F1", size)
+        self._line([("F1", right_data)], x, size)
+
+    def add_markdown(self, text: str):
+        for kind, content in markdown_blocks(text):
+            if kind in ("h1", "h2", "h3"):
+                size, above = HEADINGS[int(kind[1])]
+                # keep a heading off the bottom line of a page
+                if self.ops is not None and self.y - above - 3 * size < MARGIN:
+                    self.new_page()
+                elif self.ops is not None and self.ops:
+                    self.y -= above
+                self.text(inline_runs(content), size=size, bold=True)
+            elif kind == "bullet":
+                self.text(inline_runs(content), x=MARGIN + BULLET_INDENT,
+                          first_prefix=b"\x95")
+            else:
+                self._space(BODY_SIZE * 0.4)
+                self.text(inline_runs(content))
+
+
+def write_pdf(path, pages, title="", outline=()):
+    """Write pages (lists of content-stream lines) as a PDF file.
+
+    outline is a list of (title, 0-based page index) shown as bookmarks.
+    """
+    objects = []  # object bodies; object number = index + 1
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in once the page tree exists
+    pages_obj = add(b"")
+    font_refs = []
+    for name, (base, _) in FONTS.items():
+        ref = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+                  % base.encode())
+        font_refs.append(b"/%s %d 0 R" % (name.encode(), ref))
+    resources = b"<< /Font << " + b" ".join(font_refs) + b" >> >>"
+
+    kids = []
+    for ops in pages:
+        stream = zlib.compress(b"\n".join(ops))
+        content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+                      + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>"
+            % (pages_obj, PAGE_WIDTH, PAGE_HEIGHT, resources, content)
+        ))
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    catalog_extra = b""
+    if outline:
+        root = add(b"")
+        first = len(objects) + 1
+        last = first + len(outline) - 1
+        for n, (entry, page_index) in enumerate(outline):
+            number = first + n
+            links = b"".join((
+                b" /Prev %d 0 R" % (number - 1) if number > first else b"",
+                b" /Next %d 0 R" % (number + 1) if number < last else b"",
+            ))
+            add(b"<< /Title (" + _escape(encode(entry)) + b") /Parent %d 0 R%s /Dest [%d 0 R /Fit] >>"
+                % (root, links, kids[page_index]))
+        objects[root - 1] = b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+            first, last, len(outline))
+        catalog_extra = b" /Outlines %d 0 R /PageMode /UseOutlines" % root
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R%s >>" % (pages_obj, catalog_extra)
+    info = add(b"<< /Title (" + _escape(encode(title)) + b") /Producer (SAHAYAM md_to_pdf) >>")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, info, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def markdown_to_pdf(text: str, path, title=""):
+    """Render one markdown document to a PDF file."""
+    layout = PdfLayout()
+    layout.new_page()
+    layout.add_markdown(text)
+    write_pdf(path, layout.pages, title)
+
+
+def bundle_to_pdf(documents, path, title="", contents_title="Contents"):
+    """One PDF from several (entry, markdown) documents.
+
+    Each document starts on a new page. The file opens with a contents
+    list giving every entry's page number, and every entry is also a
+    bookmark.
+    """
+    body = PdfLayout()
+    starts = []
+    for entry, text in documents:
+        body.new_page()
+        starts.append((entry, body.page_number - 1))
+        body.add_markdown(text)
+
+    # The contents length depends only on the number of entries, so lay it
+    # out once to count its pages, then again with the final page numbers
+    offset = 0
+    for _ in range(2):
+        contents = PdfLayout()
+        contents.new_page()
+        contents.add_markdown(f"# {contents_title}")
+        for entry, start in starts:
+            contents.contents_line(entry, str(offset + start + 1))
+        offset = len(contents.pages)
+
+    outline = [(entry, offset + start) for entry, start in starts]
+    write_pdf(path, contents.pages + body.pages, title, outline)
+    return len(contents.pages) + len(body.pages)
@@ -0,0 +1,43 @@
+"""
+Messages per second from the bulk SMS generator: one stream in-process and
+sharded files written by worker processes. The target is 300,000
+messages/s per core, so 10M messages take under 10 s on 4 cores.
+
+    python bench_generate_sms.py                 # 2,000,000 messages, 4 jobs
+    python bench_generate_sms.py --count 10000000 --jobs 8
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from generate_phishing_sms import shard_rng, write_messages, write_shards
+
+TARGET_PER_CORE = 300_000
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark bulk SMS generation.")
+    ap.add_argument("--count", type=int, default=2_000_000)
+    ap.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1))
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    write_messages(io.StringIO(), args.count, shard_rng(0, 0))
+    single = time.perf_counter() - t0
+    rate = args.count / single
+    print(f"One stream      : {rate:,.0f} messages/s ({single:.2f} s)"
+          + ("" if rate >= TARGET_PER_CORE else f"  BELOW TARGET {TARGET_PER_CORE:,}"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        write_shards(tmp, args.count, shards=args.jobs * 4, jobs=args.jobs)
+        sharded = time.perf_counter() - t0
+        size = sum(f.stat().st_size for f in os.scandir(tmp))
+    print(f"{args.jobs} jobs, files : {args.count / sharded:,.0f} messages/s ({sharded:.2f} s, "
+          f"{size / 1e6:,.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Check that sms_scorer.py --parity prints exactly what the C++ sms_filter
+prints (severities, counts and --stats) on a generated message file.
+
+    make build-sms-filter
+    python check_sms_parity.py                  # 200,000 messages
+    python check_sms_parity.py --count 20000 --filter ../cpp_sms_filter/sms_filter
+"""
+import argparse
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import generate_phishing_sms
+import sms_scorer
+
+HERE = Path(__file__).resolve().parent
+SCORER = HERE / "sms_scorer.py"
+SMS_FILTER = HERE.parents[0] / "cpp_sms_filter" / "sms_filter"
+
+BENIGN = [
+    "Dinner at 8?",
+    "Reached home, will call you later.",
+    "Your electricity bill of Rs 640 has been paid. Thank you.",
+    "Japan trip photos are in the family group",
+    "मीटिंग कल सुबह 10 बजे है",
+    "రేపు ఉదయం 10 గంటలకు కలుద్దాం",
+]
+# Case, overlap and encoding corners the two tools must agree on
+EDGE_CASES = [
+    b"kYc KYC kyc",
+    b"otpan",
+    b"Reset your OTP now, PAN and Aadhaar needed",
+    b"GET 90% OFF, free GIFT and a PRIZE",
+    b"visit example.CN or example.ru",
+    b"line with windows ending\r",
+    b"   ",
+    b"\xe0\xa4\x93\xe0\xa4\x9f\xe0\xa5\x80\xe0\xa4\xaa\xe0\xa5\x80 OTP",
+    b"bad utf-8 \xff\xfe upi",
+    b"\xe2\x84\xaaYC with a Kelvin sign",
+]
+
+# The bundled table has no pattern that starts another one, so prefix
+# overlaps are checked in-process against the sms_filter loop written
+# in Python (one case-insensitive find per pattern)
+PREFIX_CASES = [
+    ([("otp", "otp", 3), ("otp code", "otp", 2)], "your OTP code is 1234"),
+    ([("pan", "bank", 3), ("pan card", "bank", 2), ("pan card update", "bank", 1)],
+     "PAN card update needed"),
+    ([("gift", "offer", 1), ("gift card", "offer", 2)], "a gift for you"),
+]
+
+
+def filter_score(patterns, message):
+    """What sms_filter scores a message as with this pattern table."""
+    lowered = message.lower()
+    return sum(weight for word, _, weight in patterns if word.lower() in lowered)
+
+
+def check_prefix_cases():
+    ok = True
+    for patterns, message in PREFIX_CASES:
+        expected = filter_score(patterns, message)
+        got = sms_scorer.Scorer(patterns).score(message)
+        if got != expected:
+            print(f"Prefix case {message!r}: sms_scorer {got}, sms_filter {expected}")
+            ok = False
+    return ok
+
+
+def write_messages(path: Path, count: int, seed: int = 11):
+    random.seed(seed)
+    rng = random.Random(seed)
+    categories = list(generate_phishing_sms.CATEGORIES)
+    with path.open("wb") as f:
+        f.write(b"\n".join(EDGE_CASES) + b"\n\n")
+        for _ in range(count):
+            if rng.random() < 0.4:
+                msg = rng.choice(BENIGN)
+            else:
+                msg = generate_phishing_sms.generate_message(rng.choice(categories))
+                if rng.random() < 0.3:
+                    msg = msg.upper()
+            f.write(msg.encode("utf-8") + b"\n")
+        # last line without a newline
+        f.write(b"Your KYC will be blocked, click bit.ly/scam")
+
+
+def run(cmd):
+    t0 = time.perf_counter()
+    out = subprocess.run(cmd, check=True, capture_output=True).stdout
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare sms_scorer.py with the C++ sms_filter.")
+    ap.add_argument("--count", type=int, default=200_000)
+    ap.add_argument("--filter", default=str(SMS_FILTER), help="path to the built sms_filter")
+    args = ap.parse_args()
+
+    if not check_prefix_cases():
+        return 1
+    print(f"Prefix overlap cases agree ({len(PREFIX_CASES)})")
+    if not Path(args.filter).exists():
+        print(f"{args.filter} not found, build it first with: make build-sms-filter")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        messages = Path(tmp) / "messages.txt"
+        write_messages(messages, args.count)
+        cpp_out, cpp_time = run([args.filter, str(messages), "--stats"])
+        py_out, py_time = run([sys.executable, str(SCORER), str(messages), "--stats", "--parity"])
+
+    print(f"sms_filter   : {cpp_time:.2f} s")
+    print(f"sms_scorer.py: {py_time:.2f} s")
+    if cpp_out == py_out:
+        print(f"Outputs identical ({len(cpp_out.splitlines())} lines)")
+        return 0
+
+    for n, (a, b) in enumerate(zip(cpp_out.splitlines(), py_out.splitlines()), 1):
+        if a != b:
+            print(f"First difference at output line {n}:")
+            print("  sms_filter   :", a.decode("utf-8", "replace"))
+            print("  sms_scorer.py:", b.decode("utf-8", "replace"))
+            break
+    else:
+        print("Outputs differ in length")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
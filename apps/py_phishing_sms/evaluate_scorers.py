@@ -0,0 +1,251 @@
+"""
+Detection quality and speed of every available scam scorer in one report.
+
+Generates labelled messages (scam categories from generate_phishing_sms plus
+benign everyday messages), runs each scorer over them and prints, per
+scorer, precision and recall per category, overall precision/recall,
+messages per second and peak memory.
+
+Per-category precision is computed one category against the benign set:
+TP(category) / (TP(category) + all benign messages flagged).
+
+    python evaluate_scorers.py                     # 50,000 scam + 50,000 benign
+    python evaluate_scorers.py --count 200000 --json eval.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import generate_phishing_sms
+import sms_scorer
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "apps" / "py_link_analyzer"))
+import link_analyzer  # noqa: E402
+
+SMS_FILTER = ROOT / "apps" / "cpp_sms_filter" / "sms_filter"
+
+BENIGN = {
+    "benign_personal": [
+        "Dinner at 8?",
+        "Reached home, will call you later.",
+        "Can you pick up {amount} grams of sugar on the way?",
+        "मीटिंग कल सुबह 10 बजे है",
+        "రేపు ఉదయం 10 గంటలకు కలుద్దాం",
+    ],
+    "benign_bank": [
+        "Rs {amount} debited from A/c XX{n} on your card. Not you? Call the number on the back of your card.",
+        "{n}482 is your OTP for login. Do not share it with anyone, bank staff will never ask for it.",
+        "Salary of Rs {amount} credited to A/c XX{n}. Available balance updated.",
+    ],
+    "benign_delivery": [
+        "Your order #{n}23 has been delivered. Thank you for shopping with us.",
+        "Your parcel will arrive tomorrow between 10 am and 2 pm.",
+    ],
+    "benign_utility": [
+        "Payment of Rs {amount} received for your electricity bill. Thank you.",
+        "Water supply will be off on Sunday from 9 am to 1 pm for maintenance.",
+    ],
+}
+
+URL_RE = re.compile(r"https?://[^\s]+")
+
+
+def labelled_messages(count, seed=1):
+    """count scam and count benign (label, is_scam, message) tuples, shuffled."""
+    rng = random.Random(seed)
+    out = [(cat, True, msg) for cat, msg in generate_phishing_sms.iter_messages(count, rng)]
+    kinds = list(BENIGN)
+    for _ in range(count):
+        kind = rng.choice(kinds)
+        msg = rng.choice(BENIGN[kind]).format(
+            amount=rng.choice(generate_phishing_sms.AMOUNTS), n=rng.randint(10, 99)
+        )
+        out.append((kind, False, msg))
+    rng.shuffle(out)
+    return out
+
+
+# Scorers: each takes the list of messages and returns one bool per message
+
+def score_sms_scorer(messages):
+    search = sms_scorer.Scorer(sms_scorer.PATTERNS + sms_scorer.INDIC_PATTERNS).regex.search
+    return [search(m) is not None for m in messages]
+
+
+def score_link_analyzer(messages):
+    """Flag a message when any URL in it scores above 0."""
+    cache = link_analyzer.VerdictCache()
+    findall = URL_RE.findall
+    analyze = link_analyzer.analyze_url
+    return [
+        any(analyze(url.rstrip(".,"), cache)["score"] > 0 for url in findall(m))
+        for m in messages
+    ]
+
+
+def score_cpp_sms_filter(messages, binary=SMS_FILTER):
+    """Run the C++ filter on a temp file; its output lists flagged lines."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "messages.txt"
+        path.write_text("".join(m + "\n" for m in messages), encoding="utf-8")
+        out = subprocess.run([str(binary), str(path)], check=True, capture_output=True).stdout
+    flagged = Counter(
+        line.split("] ", 1)[1]
+        for line in out.decode("utf-8").splitlines()
+        if line.startswith("[SUSPECT:")
+    )
+    result = []
+    for m in messages:
+        hit = flagged[m] > 0
+        if hit:
+            flagged[m] -= 1
+        result.append(hit)
+    return result
+
+
+def available_scorers(sms_filter):
+    scorers = {
+        "sms_scorer": (score_sms_scorer, False),
+        "link_analyzer": (score_link_analyzer, False),
+    }
+    if os.access(sms_filter, os.X_OK):
+        scorers["cpp_sms_filter"] = (lambda ms: score_cpp_sms_filter(ms, sms_filter), True)
+    return scorers
+
+
+def measure(func, messages, external):
+    """(flags, seconds, peak bytes). Timing and memory use separate runs,
+    since tracemalloc slows Python code down."""
+    t0 = time.perf_counter()
+    flags = func(messages)
+    elapsed = time.perf_counter() - t0
+    if external:
+        # Largest child so far; on Linux this can include memory the child
+        # shared with this process before exec, so treat it as an upper bound
+        try:
+            import resource
+        except ImportError:  # Windows
+            return flags, elapsed, None
+        scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, KiB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    else:
+        tracemalloc.start()
+        func(messages)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return flags, elapsed, peak
+
+
+def quality(labels, flags):
+    """Per-category and overall precision/recall for one scorer."""
+    tp = Counter()
+    totals = Counter()
+    benign_flagged = 0
+    benign_total = 0
+    for (category, is_scam), flagged in zip(labels, flags):
+        totals[category] += 1
+        if flagged:
+            tp[category] += 1
+        if not is_scam:
+            benign_total += 1
+            benign_flagged += flagged
+
+    categories = {}
+    for category in sorted(totals):
+        if category in BENIGN:
+            categories[category] = {
+                "messages": totals[category],
+                "false_positive_rate": tp[category] / totals[category],
+            }
+        else:
+            found = tp[category]
+            categories[category] = {
+                "messages": totals[category],
+                "precision": found / (found + benign_flagged) if found + benign_flagged else 0.0,
+                "recall": found / totals[category],
+            }
+    scam_total = len(labels) - benign_total
+    found = sum(n for c, n in tp.items() if c not in BENIGN)
+    overall = {
+        "precision": found / (found + benign_flagged) if found + benign_flagged else 0.0,
+        "recall": found / scam_total if scam_total else 0.0,
+        "false_positive_rate": benign_flagged / benign_total if benign_total else 0.0,
+    }
+    return categories, overall
+
+
+def print_report(results):
+    for name, r in results.items():
+        print(f"\n=== {name} ===")
+        if r["peak_bytes"] is None:
+            memory = "peak memory n/a"
+        elif r["external"]:
+            memory = f"peak memory {r['peak_bytes'] / 1e6:.1f} MB (child process max RSS)"
+        else:
+            memory = f"peak memory {r['peak_bytes'] / 1e6:.1f} MB (tracemalloc)"
+        print(f"{r['messages_per_sec']:,.0f} messages/s, {memory}")
+        o = r["overall"]
+        print(f"Overall: precision {o['precision']:.3f}, recall {o['recall']:.3f}, "
+              f"false positives {o['false_positive_rate']:.3f}")
+        for category, c in r["categories"].items():
+            if "recall" in c:
+                print(f"  {category:<16} precision {c['precision']:.3f}  recall {c['recall']:.3f}")
+            else:
+                print(f"  {category:<16} false positives {c['false_positive_rate']:.3f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Evaluate scam scorers on labelled messages.")
+    ap.add_argument("--count", type=int, default=50_000,
+                    help="scam messages to generate (the same number of benign ones)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--sms-filter", default=str(SMS_FILTER),
+                    help="built C++ sms_filter (skipped if missing; make build-sms-filter)")
+    ap.add_argument("--json", help="also write the results to this JSON file")
+    args = ap.parse_args()
+
+    data = labelled_messages(args.count, args.seed)
+    labels = [(category, is_scam) for category, is_scam, _ in data]
+    messages = [m for _, _, m in data]
+    print(f"Evaluating on {args.count} scam and {args.count} benign messages")
+
+    results = {}
+    skipped = []
+    for name, (func, external) in available_scorers(args.sms_filter).items():
+        try:
+            flags, elapsed, peak = measure(func, messages, external)
+        except (OSError, subprocess.CalledProcessError) as e:
+            # e.g. a binary built for another platform
+            skipped.append(f"{name}: {e}")
+            continue
+        categories, overall = quality(labels, flags)
+        results[name] = {
+            "messages_per_sec": len(messages) / elapsed,
+            "peak_bytes": peak,
+            "external": external,
+            "overall": overall,
+            "categories": categories,
+        }
+    if not os.access(args.sms_filter, os.X_OK):
+        skipped.append(f"cpp_sms_filter: {args.sms_filter} not built (make build-sms-filter)")
+    for reason in skipped:
+        print("Skipped", reason)
+
+    print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print("\nResults written to", args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
-import random
+import argparse
 import datetime
+import itertools
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 CATEGORIES = {
     "bank_kyc": [
@@ -36,16 +42,21 @@ SHORT_LINKS = [
     "rb.gy/kyc-{n}"
 ]
 
-def random_amount():
-    return random.choice(["499", "999", "2,499", "4,999", "7,500"])
+# Relative share of each category in bulk output (see --weights)
+DEFAULT_WEIGHTS = {category: 1 for category in CATEGORIES}
+
+AMOUNTS = ["499", "999", "2,499", "4,999", "7,500"]
 
-def random_link():
-    base = random.choice(SHORT_LINKS)
-    return "https://" + base.format(n=random.randint(100, 999))
+def random_amount(rng=random):
+    return rng.choice(AMOUNTS)
 
-def generate_message(category):
-    template = random.choice(CATEGORIES[category])
-    return template.format(amount=random_amount(), link=random_link())
+def random_link(rng=random):
+    base = rng.choice(SHORT_LINKS)
+    return "https://" + base.format(n=rng.randint(100, 999))
+
+def generate_message(category, rng=random):
+    template = rng.choice(CATEGORIES[category])
+    return template.format(amount=random_amount(rng), link=random_link(rng))
 
 def generate_set(n=20):
     out = []
@@ -56,12 +67,143 @@ def generate_set(n=20):
         out.append((today, cat, msg))
     return out
 
-def main():
-    msgs = generate_set(20)
-    print("# Sample suspicious SMS set")
-    print("# date, category, message\n")
-    for d, cat, msg in msgs:
-        print(f"[{d}] [{cat}] {msg}")
+# Every possible link, so bulk output draws one item instead of two
+ALL_LINKS = ["https://" + base.format(n=n) for base in SHORT_LINKS for n in range(100, 1000)]
+
+def iter_messages(n, rng, weights=None, batch=4096):
+    """Yield n (category, message) pairs drawn from rng, without building a list.
+
+    weights maps category -> relative share (DEFAULT_WEIGHTS if omitted).
+    The same rng seed always gives the same messages.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    # One draw picks category and template together: each template gets
+    # its category's weight split evenly
+    pairs = []
+    cum = []
+    total = 0
+    for cat, templates in CATEGORIES.items():
+        weight = weights.get(cat, 0)
+        if weight <= 0:
+            continue
+        for template in templates:
+            total += weight / len(templates)
+            pairs.append((cat, template))
+            cum.append(total)
+    if not pairs:
+        raise ValueError("at least one category needs a weight above 0")
+    choices = rng.choices
+    while n > 0:
+        k = min(batch, n)
+        n -= k
+        for (cat, template), amount, link in zip(
+            choices(pairs, cum_weights=cum, k=k), choices(AMOUNTS, k=k), choices(ALL_LINKS, k=k)
+        ):
+            yield cat, template.format(amount=amount, link=link)
+
+def format_line(day, category, message, fmt="labelled"):
+    if fmt == "plain":
+        return message + "\n"
+    return f"[{day}] [{category}] {message}\n"
+
+def write_messages(out, n, rng, weights=None, fmt="labelled", day=None):
+    """Stream n generated messages to a text file object; returns n."""
+    day = day or datetime.date.today().isoformat()
+    lines = (format_line(day, cat, msg, fmt) for cat, msg in iter_messages(n, rng, weights))
+    while True:
+        chunk = list(itertools.islice(lines, 8192))
+        if not chunk:
+            return n
+        out.write("".join(chunk))
+
+def shard_rng(seed, shard):
+    """Independent, reproducible generator for one shard of a bulk run."""
+    return random.Random(f"{seed}:{shard}")
+
+def _write_shard(job):
+    path, n, seed, shard, weights, fmt, day = job
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        write_messages(f, n, shard_rng(seed, shard), weights, fmt, day)
+    return path, n
+
+def write_shards(out_dir, total, shards, seed=0, weights=None, fmt="labelled", jobs=1):
+    """Split total messages over shard files in out_dir, using jobs processes.
+
+    Every shard has its own seed, so the files are identical whatever the
+    number of jobs.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    day = datetime.date.today().isoformat()
+    width = max(4, len(str(shards - 1)))
+    base, extra = divmod(total, shards)
+    work = [
+        (out_dir / f"sms-{i:0{width}d}.txt", base + (i < extra), seed, i, weights, fmt, day)
+        for i in range(shards)
+    ]
+    if jobs <= 1:
+        return [_write_shard(job) for job in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_write_shard, work))
+
+def parse_weights(text):
+    """"bank_kyc=3,upi=2" -> weights; categories not named get 0.
+
+    Weights must be non-negative and not all 0 (random.choices needs a
+    positive total); argparse reports a bad one as a usage error.
+    """
+    weights = {c: 0 for c in CATEGORIES}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in CATEGORIES:
+            raise argparse.ArgumentTypeError(
+                f"unknown category {name!r} (choose from {', '.join(CATEGORIES)})"
+            )
+        try:
+            weights[name] = float(value) if value else 1
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad weight for {name}: {value!r}")
+        if not 0 <= weights[name] < float("inf"):
+            raise argparse.ArgumentTypeError(
+                f"weight for {name} must be a non-negative number, not {value!r}"
+            )
+    if not sum(weights.values()):
+        raise argparse.ArgumentTypeError("at least one weight must be above 0")
+    return weights
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Generate fake scam SMS. Without --count, print a 20-message sample set."
+    )
+    ap.add_argument("--count", type=int, help="number of messages to generate in bulk")
+    ap.add_argument("--seed", type=int, default=0, help="seed for bulk output (default 0)")
+    ap.add_argument("--weights", type=parse_weights,
+                    help="category mix, e.g. bank_kyc=3,upi=2,courier=1 (default: equal)")
+    ap.add_argument("--format", choices=["labelled", "plain"], default="labelled",
+                    help="labelled: [date] [category] message; plain: message only")
+    ap.add_argument("--out", help="directory for shard files (default: stdout)")
+    ap.add_argument("--shards", type=int, default=1, help="number of shard files with --out")
+    ap.add_argument("--jobs", type=int, default=1, help="worker processes writing shards")
+    args = ap.parse_args(argv)
+
+    if args.count is None:
+        msgs = generate_set(20)
+        print("# Sample suspicious SMS set")
+        print("# date, category, message\n")
+        for d, cat, msg in msgs:
+            print(f"[{d}] [{cat}] {msg}")
+        return
+
+    if args.out:
+        t0 = time.perf_counter()
+        written = write_shards(args.out, args.count, max(1, args.shards), args.seed,
+                               args.weights, args.format, args.jobs)
+        elapsed = time.perf_counter() - t0
+        print(f"Written {args.count} messages to {len(written)} files in {args.out} "
+              f"({elapsed:.2f} s, {args.count / elapsed:,.0f} messages/s)", file=sys.stderr)
+    else:
+        write_messages(sys.stdout, args.count, shard_rng(args.seed, 0), args.weights, args.format)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+"""
+Score SMS messages for scam patterns, one message per line.
+
+Uses the same pattern/category/weight table as apps/cpp_sms_filter and the
+same HIGH (>= 5) / MEDIUM (>= 3) / LOW severities, but finds every pattern
+in a single regex pass per message instead of one search per pattern.
+Telugu and Hindi patterns are added on top unless --parity is given.
+
+Usage:
+  python sms_scorer.py messages.txt [--stats]
+  python sms_scorer.py messages.txt --stats --parity   # exactly like sms_filter
+"""
+import argparse
+import re
+import sys
+from collections import Counter
+
+# Same order and weights as the table in cpp_sms_filter/sms_filter.cpp.
+# Matching ignores case, so "KYC" and "kyc" both hit and count twice.
+PATTERNS = [
+    ("KYC", "bank", 3), ("kyc", "bank", 3),
+    ("account blocked", "bank", 3),
+    ("verify", "bank", 2),
+    ("UPI", "bank", 3), ("upi", "bank", 3),
+    ("Aadhaar", "bank", 3), ("aadhaar", "bank", 3),
+    ("PAN", "bank", 3), ("pan", "bank", 3),
+    ("OTP", "otp", 3), ("otp", "otp", 3),
+    ("reset", "otp", 2),
+    ("refund", "offer", 2),
+    ("90% off", "offer", 2),
+    ("prize", "offer", 2),
+    ("gift", "offer", 1),
+    ("bit.ly", "link", 3),
+    ("tinyurl", "link", 3),
+    (".cn", "link", 2),
+    (".ru", "link", 2),
+]
+
+# Telugu and Hindi wording of the same scams (checklist languages te/hi)
+INDIC_PATTERNS = [
+    ("केवाईसी", "bank", 3), ("కేవైసీ", "bank", 3),
+    ("खाता बंद", "bank", 3), ("ఖాతా బ్లాక్", "bank", 3),
+    ("आधार", "bank", 3), ("ఆధార్", "bank", 3),
+    ("ओटीपी", "otp", 3), ("ఓటీపీ", "otp", 3),
+    ("रिफंड", "offer", 2), ("రీఫండ్", "offer", 2),
+    ("इनाम", "offer", 2), ("బహుమతి", "offer", 2),
+]
+
+
+class Scorer:
+    """All patterns compiled into one lookahead alternation.
+
+    A lookahead match is found at every position, so overlapping patterns
+    ("otpan" holds both "otp" and "pan") are all seen. Case folding is
+    ASCII only, like std::tolower in the C++ filter.
+
+    The alternation captures only one pattern per position, the longest.
+    Every other pattern that matches at that position is a prefix of it
+    ("otp" for "otp code"), so each captured pattern stands for itself
+    and all its prefixes in the table (see covers).
+    """
+
+    def __init__(self, patterns=PATTERNS):
+        self.weights = {}
+        self.categories = {}
+        for word, category, weight in patterns:
+            key = word.lower()
+            self.weights[key] = self.weights.get(key, 0) + weight
+            self.categories.setdefault(key, []).append(category)
+        # Longest first, so each position captures its longest pattern
+        words = sorted(self.weights, key=len, reverse=True)
+        # Pattern -> itself and every shorter pattern it starts with
+        self.covers = {w: tuple(p for p in words if w.startswith(p)) for w in words}
+        self.regex = re.compile(
+            "(?=(" + "|".join(map(re.escape, words)) + "))", re.IGNORECASE | re.ASCII
+        )
+
+    def hits(self, message: str) -> set[str]:
+        """Lower-cased patterns found in the message."""
+        covers = self.covers
+        return {p for m in self.regex.findall(message) for p in covers[m.lower()]}
+
+    def score(self, message: str) -> int:
+        weights = self.weights
+        return sum(weights[w] for w in self.hits(message))
+
+
+def severity(score: int) -> str:
+    if score >= 5:
+        return "HIGH"
+    if score >= 3:
+        return "MEDIUM"
+    return "LOW"
+
+
+def scan(lines, scorer: Scorer, out, category_counts: Counter = None):
+    """Write a [SUSPECT:...] line for each flagged message; returns (total, flagged)."""
+    total = flagged = 0
+    weights = scorer.weights
+    covers = scorer.covers
+    findall = scorer.regex.findall
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line:
+            continue
+        total += 1
+        found = findall(line)
+        if not found:
+            continue
+        hits = {p for m in found for p in covers[m.lower()]}
+        flagged += 1
+        out.write(f"[SUSPECT:{severity(sum(weights[w] for w in hits))}] {line}\n")
+        if category_counts is not None:
+            for w in hits:
+                category_counts.update(scorer.categories[w])
+    return total, flagged
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Score SMS messages for scam patterns.")
+    ap.add_argument("file", help="text file with one message per line, or - for stdin")
+    ap.add_argument("--stats", action="store_true", help="print pattern hits per category")
+    ap.add_argument("--parity", action="store_true",
+                    help="use only the cpp_sms_filter patterns (no Telugu/Hindi ones)")
+    args = ap.parse_args(argv)
+
+    scorer = Scorer(PATTERNS if args.parity else PATTERNS + INDIC_PATTERNS)
+    counts = Counter() if args.stats else None
+    # Lines are split on "\n" only and bytes that are not UTF-8 are written
+    # back unchanged, so the output matches sms_filter byte for byte
+    out = open(sys.stdout.fileno(), "w", encoding="utf-8", errors="surrogateescape",
+               newline="\n", closefd=False, buffering=1 << 16)
+    try:
+        if args.file == "-":
+            src = open(sys.stdin.fileno(), encoding="utf-8", errors="surrogateescape",
+                       newline="\n", closefd=False)
+        else:
+            src = open(args.file, encoding="utf-8", errors="surrogateescape", newline="\n")
+    except OSError:
+        print(f"Cannot open {args.file}", file=sys.stderr)
+        return 1
+
+    with src:
+        total, flagged = scan(src, scorer, out, counts)
+    out.write(f"Scanned {total} messages, flagged {flagged}\n")
+    if counts is not None:
+        out.write("Category stats:\n")
+        for category in sorted(counts):
+            out.write(f"  {category}: {counts[category]}\n")
+    out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())